@@ -15,6 +15,7 @@
         "views/res_config_settings_views.xml",
         "views/trade_views.xml",
         "views/help_templates.xml",
+        "views/chart_templates.xml",
         "wizard/plot_wizard_view.xml",
     ],
     "installable": True,
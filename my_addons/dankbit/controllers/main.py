@@ -1,33 +1,26 @@
-import numpy as np
-import time
 from datetime import datetime, timezone, timedelta
-from io import BytesIO
 import logging
-from odoo import http
+import time
+from werkzeug.http import http_date
+from odoo import SUPERUSER_ID, api, http
 from odoo.http import request
-from . import options
-from . import delta
-from . import gamma
+from ..lib import chart_events, curve_data, render_pool
+from ..lib.chart_cache import chart_etag
+from ..lib.chart_events import TRADE_EVENTS
+from ..models.settings import DankbitSettings
 from zoneinfo import ZoneInfo
-import matplotlib.pyplot as plt
 
 
 _logger = logging.getLogger(__name__)
 
-_INDEX_CACHE = {
-    "timestamp": 0,
-    "price": None,
-}
-
-_CACHE_TTL = 120  # in seconds
-
-# -----------------------------
-# ETH defaults (Option A)
-# -----------------------------
-ETH_DEFAULT_FROM = 1000.0
-ETH_DEFAULT_TO = 6000.0
-ETH_DEFAULT_STEPS = 10
-
+# Formats a chart event stream can carry: the new PNG ETag or text curve data.
+EVENT_FORMATS = ("png", "json", "plotly")
+# Comment lines keep proxies from closing idle streams.
+EVENT_KEEPALIVE = 25
+EVENT_RETRY_MS = 5000
+# Streams end after this long and the browser reconnects (with
+# Last-Event-ID), so no stream outlives limit_time_real (120 s by default).
+EVENT_STREAM_SECONDS = 90
 
 class ChartController(http.Controller):
     @staticmethod
@@ -60,6 +53,138 @@ class ChartController(http.Controller):
         from_hour_ts = now.replace(hour=from_hour, minute=0, second=0, microsecond=0)
         return from_hour_ts
 
+    def _chart_response(self, instrument, chart, minutes_ago=0, fmt="png", points=0):
+        """Serve a chart PNG, its interactive "html" page, or its curve data
+        for fmt "json" / "f32" / "plotly" (see dankbit.chart).
+
+        The hash of the chart key is the ETag, so a browser that already
+        has the current chart gets a 304 without a cache lookup or render.
+        """
+        settings = DankbitSettings.get(request.env)
+        Chart = request.env['dankbit.chart'].sudo()
+        spec = Chart._chart_spec(instrument, chart, settings, minutes_ago)
+        key = Chart._chart_key(instrument, chart, settings, minutes_ago, fmt, points)
+        etag = chart_etag(key)
+        headers = [
+            ("Cache-Control", "no-cache"),
+            ("ETag", f'"{etag}"'),
+        ]
+        if fmt == "png":
+            headers.append(("Refresh", spec["refresh_interval"]))
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response(b"", headers=headers, status=304)
+
+        try:
+            entry = Chart._get_chart(instrument, chart, settings, minutes_ago, key=key,
+                                     fmt=fmt, points=points)
+        except render_pool.RenderTimeout as e:
+            _logger.warning("%s", e)
+            return request.make_response(
+                "Chart rendering is behind, try again shortly",
+                headers=[("Content-Type", "text/plain"), ("Retry-After", "5")], status=503)
+        modified_since = request.httprequest.if_modified_since
+        if modified_since and modified_since.timestamp() >= int(entry.last_modified):
+            return request.make_response(b"", headers=headers, status=304)
+
+        headers.append(("Last-Modified", http_date(entry.last_modified)))
+        if fmt == "png":
+            headers += [
+                ("Content-Type", "image/png"),
+                ("Content-Disposition", f'inline; filename="{spec["filename"]}"'),
+            ]
+        elif fmt == "html":
+            headers.append(("Content-Type", "text/html; charset=utf-8"))
+        else:
+            headers.append(("Content-Type", curve_data.FORMATS[fmt]))
+        return request.make_response(entry.body, headers=headers)
+
+    def _data_response(self, instrument, chart, minutes_ago=0, format="json", points=0, **kw):
+        if format not in curve_data.FORMATS:
+            return request.make_response(
+                f"Unknown format {format!r}, use one of: {', '.join(curve_data.FORMATS)}",
+                headers=[("Content-Type", "text/plain")], status=400)
+        try:
+            points = max(int(points), 0)
+        except ValueError:
+            points = 0
+        return self._chart_response(instrument, chart, minutes_ago, fmt=format, points=points)
+
+    def _html_response(self, instrument, chart, minutes_ago=0, points=1000, **kw):
+        try:
+            points = max(int(points), 0)
+        except ValueError:
+            points = 1000
+        return self._chart_response(instrument, chart, minutes_ago, fmt="html", points=points)
+
+    def _events_response(self, instrument, chart, minutes_ago=0, format="png", points=0, **kw):
+        """Server-Sent Events stream with an event whenever the chart changes.
+
+        Each event has the chart ETag as its id; its data is that ETag for
+        format=png, or the curve data for json / plotly. The stream sleeps
+        on chart_events until trades of the instrument are committed (or
+        the chart key rolls over with time) and only then opens a short
+        cursor to look at the chart key; nothing is rendered for a stream
+        whose chart did not change.
+
+        An open stream holds its HTTP thread (or, with workers > 0, a whole
+        worker) for up to EVENT_STREAM_SECONDS. In multi-worker deployments
+        route the /events URLs to the gevent port like /websocket, where a
+        stream only costs a greenlet.
+        """
+        if format not in EVENT_FORMATS:
+            return request.make_response(
+                f"Unknown format {format!r}, use one of: {', '.join(EVENT_FORMATS)}",
+                headers=[("Content-Type", "text/plain")], status=400)
+        try:
+            points = max(int(points), 0)
+        except ValueError:
+            points = 0
+
+        registry = request.env.registry
+        dbname = request.db
+        last_etag = request.httprequest.headers.get("Last-Event-ID")
+
+        def check():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                settings = DankbitSettings.get(env)
+                Chart = env["dankbit.chart"]
+                key = Chart._chart_key(instrument, chart, settings, minutes_ago, format, points)
+                etag = chart_etag(key)
+                expires = Chart._chart_key_expiry(settings, minutes_ago)
+                if etag == last_etag:
+                    return etag, None, expires
+                if format == "png":
+                    data = etag
+                else:
+                    entry = Chart._get_chart(instrument, chart, settings, minutes_ago, key=key,
+                                             fmt=format, points=points)
+                    data = entry.body.decode()
+                return etag, f"id: {etag}\nevent: chart\ndata: {data}\n\n".encode(), expires
+
+        def stream():
+            nonlocal last_etag
+            seq = TRADE_EVENTS.seq
+            end = time.monotonic() + EVENT_STREAM_SECONDS
+            yield f"retry: {EVENT_RETRY_MS}\n\n".encode()
+            while time.monotonic() < end:
+                last_etag, event, expires = check()
+                if event:
+                    yield event
+                deadline = min(time.monotonic() + expires, end)
+                while (timeout := deadline - time.monotonic()) > 0:
+                    seq, events = TRADE_EVENTS.wait(seq, min(timeout, EVENT_KEEPALIVE))
+                    if any(db in (dbname, None) and chart_events.matches(instrument, names)
+                           for db, names in events):
+                        break
+                    yield b": keepalive\n\n"
+
+        return request.make_response(stream(), headers=[
+            ("Content-Type", "text/event-stream"),
+            ("Cache-Control", "no-cache"),
+            ("X-Accel-Buffering", "no"),
+        ])
+
     @http.route('/help', auth='public', type='http', website=True)
     def help_page(self):
         return request.render('dankbit.dankbit_help')
@@ -72,78 +197,8 @@ class ChartController(http.Controller):
         "/<string:instrument>/c/<int:minutes_ago>",
     ], type="http", auth="public", website=True)
     def chart_png_calls(self, instrument, minutes_ago=0):
-        plot_title = "taker calls"
-        icp = request.env['ir.config_parameter'].sudo()
-
-        day_from_price = float(icp.get_param("dankbit.from_price", default=ETH_DEFAULT_FROM))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=ETH_DEFAULT_TO))
-        steps = int(icp.get_param("dankbit.steps", default=ETH_DEFAULT_STEPS))
-        refresh_interval = int(icp.get_param("dankbit.refresh_interval", default=60))
-        last_hedging_time = icp.get_param("dankbit.last_hedging_time")
-        mock_0dte = icp.get_param('dankbit.mock_0dte')
-        start_from_ts = int(icp.get_param("dankbit.from_days_ago"))
-        start_ts = self.get_midnight_ts(days_offset=start_from_ts)
-
-        if last_hedging_time:
-            start_ts = last_hedging_time
-
-        if minutes_ago:
-            start_ts = datetime.now() - timedelta(minutes=minutes_ago)
-            plot_title = f"{plot_title} from {str(minutes_ago)} minutes ago"
-
-        trades = request.env['dankbit.trade'].sudo().search(
-            domain=[
-                ("name", "ilike", f"{instrument}"),
-                ("option_type", "=", "call"),
-                ("deribit_ts", ">=", start_ts),
-                ("is_block_trade", "=", False),
-            ]
-        )
+        return self._chart_response(instrument, "c", minutes_ago)
 
-        # index_price = request.env['dankbit.trade'].sudo().get_index_price()
-        index_price = 0
-        now = time.time()
-        if _INDEX_CACHE["price"] and (now - _INDEX_CACHE["timestamp"] < _CACHE_TTL):
-            index_price = _INDEX_CACHE["price"]
-        else:
-            index_price = request.env['dankbit.trade'].sudo().get_index_price()
-            _INDEX_CACHE["price"] = index_price
-            _INDEX_CACHE["timestamp"] = now
-
-        obj = options.OptionStrat(instrument, index_price, day_from_price, day_to_price, steps)
-
-        for trade in trades:
-            if trade.direction == "buy":
-                obj.long_call(trade.strike, trade.price * trade.index_price)
-            elif trade.direction == "sell":
-                obj.short_call(trade.strike, trade.price * trade.index_price)
-
-        STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05, mock_0dte)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05, mock_0dte)
-
-        fig, ax = obj.plot(index_price, market_deltas, market_gammas, "taker", plot_title)
-
-        ax.text(
-            0.01, 0.02,
-            f"{len(trades)} trades",
-            transform=ax.transAxes,
-            fontsize=14,
-        )
-
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-
-        png_data = buf.getvalue()
-
-        headers = [
-            ("Content-Type", "image/png"),
-            ("Cache-Control", "no-cache"),
-            ("Content-Disposition", f'inline; filename="{instrument}_calls.png"'),
-            ("Refresh", refresh_interval),
-        ]
-        return request.make_response(png_data, headers=headers)
     # ============================
     # PUTS
     # ============================
@@ -152,78 +207,7 @@ class ChartController(http.Controller):
         "/<string:instrument>/p/<int:minutes_ago>",
     ], type="http", auth="public", website=True)
     def chart_png_puts(self, instrument, minutes_ago=0):
-        plot_title = "taker puts"
-        icp = request.env['ir.config_parameter'].sudo()
-
-        day_from_price = float(icp.get_param("dankbit.from_price", default=ETH_DEFAULT_FROM))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=ETH_DEFAULT_TO))
-        steps = int(icp.get_param("dankbit.steps", default=ETH_DEFAULT_STEPS))
-        refresh_interval = int(icp.get_param("dankbit.refresh_interval", default=60))
-        last_hedging_time = icp.get_param("dankbit.last_hedging_time")
-        mock_0dte = icp.get_param('dankbit.mock_0dte')
-        start_from_ts = int(icp.get_param("dankbit.from_days_ago"))
-        start_ts = self.get_midnight_ts(days_offset=start_from_ts)
-
-        if last_hedging_time:
-            start_ts = last_hedging_time
-
-        if minutes_ago:
-            start_ts = datetime.now() - timedelta(minutes=minutes_ago)
-            plot_title = f"{plot_title} from {str(minutes_ago)} minutes ago"
-
-        trades = request.env['dankbit.trade'].sudo().search(
-            domain=[
-                ("name", "ilike", f"{instrument}"),
-                ("option_type", "=", "put"),
-                ("deribit_ts", ">=", start_ts),
-                ("is_block_trade", "=", False),
-            ]
-        )
-
-        # index_price = request.env['dankbit.trade'].sudo().get_index_price()
-        index_price = 0
-        now = time.time()
-        if _INDEX_CACHE["price"] and (now - _INDEX_CACHE["timestamp"] < _CACHE_TTL):
-            index_price = _INDEX_CACHE["price"]
-        else:
-            index_price = request.env['dankbit.trade'].sudo().get_index_price()
-            _INDEX_CACHE["price"] = index_price
-            _INDEX_CACHE["timestamp"] = now
-
-        obj = options.OptionStrat(instrument, index_price, day_from_price, day_to_price, steps)
-
-        for trade in trades:
-            if trade.direction == "buy":
-                obj.long_put(trade.strike, trade.price * trade.index_price)
-            elif trade.direction == "sell":
-                obj.short_put(trade.strike, trade.price * trade.index_price)
-
-        STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05, mock_0dte)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05, mock_0dte)
-
-        fig, ax = obj.plot(index_price, market_deltas, market_gammas, "taker", plot_title)
-
-        ax.text(
-            0.01, 0.02,
-            f"{len(trades)} trades",
-            transform=ax.transAxes,
-            fontsize=14,
-        )
-
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-
-        png_data = buf.getvalue()
-
-        headers = [
-            ("Content-Type", "image/png"),
-            ("Cache-Control", "no-cache"),
-            ("Content-Disposition", f'inline; filename="{instrument}_puts.png"'),
-            ("Refresh", refresh_interval),
-        ]
-        return request.make_response(png_data, headers=headers)
+        return self._chart_response(instrument, "p", minutes_ago)
 
     # ============================
     # BUYS
@@ -233,78 +217,7 @@ class ChartController(http.Controller):
         "/<string:instrument>/b/<int:minutes_ago>",
     ], type="http", auth="public", website=True)
     def chart_png_buys(self, instrument, minutes_ago=0):
-        plot_title = "taker buys"
-        icp = request.env['ir.config_parameter'].sudo()
-
-        day_from_price = float(icp.get_param("dankbit.from_price", default=ETH_DEFAULT_FROM))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=ETH_DEFAULT_TO))
-        steps = int(icp.get_param("dankbit.steps", default=ETH_DEFAULT_STEPS))
-        refresh_interval = int(icp.get_param("dankbit.refresh_interval", default=60))
-        last_hedging_time = icp.get_param("dankbit.last_hedging_time")
-        mock_0dte = icp.get_param('dankbit.mock_0dte')
-        start_from_ts = int(icp.get_param("dankbit.from_days_ago"))
-        start_ts = self.get_midnight_ts(days_offset=start_from_ts)
-
-        if last_hedging_time:
-            start_ts = last_hedging_time
-
-        if minutes_ago:
-            start_ts = datetime.now() - timedelta(minutes=minutes_ago)
-            plot_title = f"{plot_title} from {str(minutes_ago)} minutes ago"
-
-        trades = request.env['dankbit.trade'].sudo().search(
-            domain=[
-                ("name", "ilike", f"{instrument}"),
-                ("direction", "=", "buy"),
-                ("deribit_ts", ">=", start_ts),
-                ("is_block_trade", "=", False),
-            ]
-        )
-
-        # index_price = request.env['dankbit.trade'].sudo().get_index_price()
-        index_price = 0
-        now = time.time()
-        if _INDEX_CACHE["price"] and (now - _INDEX_CACHE["timestamp"] < _CACHE_TTL):
-            index_price = _INDEX_CACHE["price"]
-        else:
-            index_price = request.env['dankbit.trade'].sudo().get_index_price()
-            _INDEX_CACHE["price"] = index_price
-            _INDEX_CACHE["timestamp"] = now
-
-        obj = options.OptionStrat(instrument, index_price, day_from_price, day_to_price, steps)
-
-        for trade in trades:
-            if trade.option_type == "call":
-                obj.long_call(trade.strike, trade.price * trade.index_price)
-            elif trade.option_type == "put":
-                obj.long_put(trade.strike, trade.price * trade.index_price)
-
-        STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05, mock_0dte)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05, mock_0dte)
-
-        fig, ax = obj.plot(index_price, market_deltas, market_gammas, "taker", plot_title)
-
-        ax.text(
-            0.01, 0.02,
-            f"{len(trades)} trades",
-            transform=ax.transAxes,
-            fontsize=14,
-        )
-
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-
-        png_data = buf.getvalue()
-
-        headers = [
-            ("Content-Type", "image/png"),
-            ("Cache-Control", "no-cache"),
-            ("Content-Disposition", f'inline; filename="{instrument}_buys.png"'),
-            ("Refresh", refresh_interval),
-        ]
-        return request.make_response(png_data, headers=headers)
+        return self._chart_response(instrument, "b", minutes_ago)
 
     # ============================
     # SELLS
@@ -314,78 +227,7 @@ class ChartController(http.Controller):
         "/<string:instrument>/s/<int:minutes_ago>",
     ], type="http", auth="public", website=True)
     def chart_png_sells(self, instrument, minutes_ago=0):
-        plot_title = "taker sells"
-        icp = request.env['ir.config_parameter'].sudo()
-
-        day_from_price = float(icp.get_param("dankbit.from_price", default=ETH_DEFAULT_FROM))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=ETH_DEFAULT_TO))
-        steps = int(icp.get_param("dankbit.steps", default=ETH_DEFAULT_STEPS))
-        refresh_interval = int(icp.get_param("dankbit.refresh_interval", default=60))
-        last_hedging_time = icp.get_param("dankbit.last_hedging_time")
-        mock_0dte = icp.get_param('dankbit.mock_0dte')
-        start_from_ts = int(icp.get_param("dankbit.from_days_ago"))
-        start_ts = self.get_midnight_ts(days_offset=start_from_ts)
-
-        if last_hedging_time:
-            start_ts = last_hedging_time
-
-        if minutes_ago:
-            start_ts = datetime.now() - timedelta(minutes=minutes_ago)
-            plot_title = f"{plot_title} from {str(minutes_ago)} minutes ago"
-
-        trades = request.env['dankbit.trade'].sudo().search(
-            domain=[
-                ("name", "ilike", f"{instrument}"),
-                ("direction", "=", "sell"),
-                ("deribit_ts", ">=", start_ts),
-                ("is_block_trade", "=", False),
-            ]
-        )
-
-        # index_price = request.env['dankbit.trade'].sudo().get_index_price()
-        index_price = 0
-        now = time.time()
-        if _INDEX_CACHE["price"] and (now - _INDEX_CACHE["timestamp"] < _CACHE_TTL):
-            index_price = _INDEX_CACHE["price"]
-        else:
-            index_price = request.env['dankbit.trade'].sudo().get_index_price()
-            _INDEX_CACHE["price"] = index_price
-            _INDEX_CACHE["timestamp"] = now
-
-        obj = options.OptionStrat(instrument, index_price, day_from_price, day_to_price, steps)
-
-        for trade in trades:
-            if trade.option_type == "call":
-                obj.short_call(trade.strike, trade.price * trade.index_price)
-            elif trade.option_type == "put":
-                obj.short_put(trade.strike, trade.price * trade.index_price)
-
-        STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05, mock_0dte)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05, mock_0dte)
-
-        fig, ax = obj.plot(index_price, market_deltas, market_gammas, "taker", plot_title)
-
-        ax.text(
-            0.01, 0.02,
-            f"{len(trades)} trades",
-            transform=ax.transAxes,
-            fontsize=14,
-        )
-
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-
-        png_data = buf.getvalue()
-    
-        headers = [
-            ("Content-Type", "image/png"),
-            ("Cache-Control", "no-cache"),
-            ("Content-Disposition", f'inline; filename="{instrument}_sells.png"'),
-            ("Refresh", refresh_interval),
-        ]
-        return request.make_response(png_data, headers=headers)
+        return self._chart_response(instrument, "s", minutes_ago)
 
     # ============================
     # DAY VIEW: MMV / TV / etc.
@@ -395,188 +237,96 @@ class ChartController(http.Controller):
         "/<string:instrument>/<string:view_type>/<int:minutes_ago>",
     ], type="http", auth="public", website=True)
     def chart_png_day(self, instrument, view_type, minutes_ago=0):
-        # keep original for filename
-        original_view_type = view_type
-        plot_title = f"{original_view_type}"
-
-        icp = request.env['ir.config_parameter'].sudo()
-
-        day_from_price = float(icp.get_param("dankbit.from_price", default=ETH_DEFAULT_FROM))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=ETH_DEFAULT_TO))
-        steps = int(icp.get_param("dankbit.steps", default=ETH_DEFAULT_STEPS))
-        refresh_interval = int(icp.get_param("dankbit.refresh_interval", default=60))
-        last_hedging_time = icp.get_param("dankbit.last_hedging_time")
-        mock_0dte = icp.get_param('dankbit.mock_0dte')
-        start_from_ts = int(icp.get_param("dankbit.from_days_ago"))
-        start_ts = self.get_midnight_ts(days_offset=start_from_ts)
-
-        if last_hedging_time:
-            start_ts = last_hedging_time
-
-        if minutes_ago:
-            start_ts = datetime.now() - timedelta(minutes=minutes_ago)
-            plot_title = f"{plot_title} from {str(minutes_ago)} minutes ago"
-        else:
-            plot_title = f"{plot_title} today"
+        return self._chart_response(instrument, view_type, minutes_ago)
 
-        trades = request.env['dankbit.trade'].sudo().search(
-            domain=[
-                ("name", "ilike", f"{instrument}"),
-                ("deribit_ts", ">=", start_ts),
-                ("is_block_trade", "=", False),
-            ]
-        )
-
-        # index_price = request.env['dankbit.trade'].sudo().get_index_price()
-        index_price = 0
-        now = time.time()
-        if _INDEX_CACHE["price"] and (now - _INDEX_CACHE["timestamp"] < _CACHE_TTL):
-            index_price = _INDEX_CACHE["price"]
-        else:
-            index_price = request.env['dankbit.trade'].sudo().get_index_price()
-            _INDEX_CACHE["price"] = index_price
-            _INDEX_CACHE["timestamp"] = now
-
-        obj = options.OptionStrat(instrument, index_price, day_from_price, day_to_price, steps)
-
-        for trade in trades:
-            if trade.option_type == "call":
-                if trade.direction == "buy":
-                    obj.long_call(trade.strike, trade.price * trade.index_price)
-                elif trade.direction == "sell":
-                    obj.short_call(trade.strike, trade.price * trade.index_price)
-            elif trade.option_type == "put":
-                if trade.direction == "buy":
-                    obj.long_put(trade.strike, trade.price * trade.index_price)
-                elif trade.direction == "sell":
-                    obj.short_put(trade.strike, trade.price * trade.index_price)
-
-        STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05, mock_0dte)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05, mock_0dte)
-
-        # normalize view_type for plotting
-        vt = (original_view_type or "").lower()
-        if vt in ("mmv", "mm"):
-            internal_view_type = "mm"
-        elif vt in ("tv", "taker"):
-            internal_view_type = "taker"
-        elif vt in ("be_mm", "be-mm", "bem"):
-            internal_view_type = "be_mm"
-        elif vt in ("be_taker", "be-taker", "bet"):
-            internal_view_type = "be_taker"
-        else:
-            internal_view_type = original_view_type
-
-        # IMPORTANT: do NOT pass string strike here,
-        # so options.OptionStrat.plot keeps view_type logic intact.
-        fig, ax = obj.plot(index_price, market_deltas, market_gammas, internal_view_type, plot_title)
-
-        ax.text(
-            0.01, 0.02,
-            f"{len(trades)} trades",
-            transform=ax.transAxes,
-            fontsize=14,
-        )
-
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        buf.seek(0)
-
-        png_data = buf.getvalue()
-
-        headers = [
-            ("Content-Type", "image/png"),
-            ("Cache-Control", "no-cache"),
-            ("Content-Disposition",
-             f'inline; filename="{instrument}_{original_view_type}_{minutes_ago}_minutes.png"'),
-            ("Refresh", refresh_interval),
-        ]
-        return request.make_response(png_data, headers=headers)
     # ============================
     # ALL TRADES VIEW
     # ============================
     @http.route("/<string:instrument>/<string:view_type>/a", type="http", auth="public", website=True)
     def chart_png_all(self, instrument, view_type):
-        original_view_type = view_type
-        plot_title = f"{original_view_type} all"
-        icp = request.env['ir.config_parameter'].sudo()
-
-        day_from_price = float(icp.get_param("dankbit.from_price", default=ETH_DEFAULT_FROM))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=ETH_DEFAULT_TO))
-        steps = int(icp.get_param("dankbit.steps", default=ETH_DEFAULT_STEPS))
-        refresh_interval = int(icp.get_param("dankbit.refresh_interval", default=60))
-        mock_0dte = icp.get_param('dankbit.mock_0dte')
-
-        trades = request.env['dankbit.trade'].sudo().search(
-            domain=[
-                ("name", "ilike", f"{instrument}"),
-                ("is_block_trade", "=", False),
-            ]
-        )
+        return self._chart_response(instrument, f"{view_type}/a")
 
-        # index_price = request.env['dankbit.trade'].sudo().get_index_price()
-        index_price = 0
-        now = time.time()
-        if _INDEX_CACHE["price"] and (now - _INDEX_CACHE["timestamp"] < _CACHE_TTL):
-            index_price = _INDEX_CACHE["price"]
-        else:
-            index_price = request.env['dankbit.trade'].sudo().get_index_price()
-            _INDEX_CACHE["price"] = index_price
-            _INDEX_CACHE["timestamp"] = now
-
-        obj = options.OptionStrat(instrument, index_price, day_from_price, day_to_price, steps)
-
-        for trade in trades:
-            if trade.option_type == "call":
-                if trade.direction == "buy":
-                    obj.long_call(trade.strike, trade.price * trade.index_price)
-                elif trade.direction == "sell":
-                    obj.short_call(trade.strike, trade.price * trade.index_price)
-            elif trade.option_type == "put":
-                if trade.direction == "buy":
-                    obj.long_put(trade.strike, trade.price * trade.index_price)
-                elif trade.direction == "sell":
-                    obj.short_put(trade.strike, trade.price * trade.index_price)
-
-        STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05, mock_0dte)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05, mock_0dte)
-
-        vt = (original_view_type or "").lower()
-        if vt in ("mmv", "mm"):
-            internal_view_type = "mm"
-        elif vt in ("tv", "taker"):
-            internal_view_type = "taker"
-        elif vt in ("be_mm", "be-mm", "bem"):
-            internal_view_type = "be_mm"
-        elif vt in ("be_taker", "be-taker", "bet"):
-            internal_view_type = "be_taker"
-        else:
-            internal_view_type = original_view_type
+    # ============================
+    # CURVE DATA (JSON / float32)
+    # ============================
+    @http.route([
+        "/<string:instrument>/<string:view_type>/data",
+        "/<string:instrument>/<string:view_type>/data/<int:minutes_ago>",
+    ], type="http", auth="public", website=True)
+    def chart_data(self, instrument, view_type, minutes_ago=0, **kw):
+        """Curves behind /<instrument>/<view_type>, without drawing them.
 
-        fig, ax = obj.plot(index_price, market_deltas, market_gammas, internal_view_type, plot_title)
+        ?format=json (default), f32 (packed little-endian float32, layout
+        in curve_data) or plotly (a Plotly figure), ?points=N thins the
+        price grid to about N points.
+        """
+        return self._data_response(instrument, view_type, minutes_ago, **kw)
 
-        ax.text(
-            0.01, 0.02,
-            f"{len(trades)} trades",
-            transform=ax.transAxes,
-            fontsize=14,
-        )
+    @http.route("/<string:instrument>/<string:view_type>/a/data", type="http", auth="public", website=True)
+    def chart_data_all(self, instrument, view_type, **kw):
+        return self._data_response(instrument, f"{view_type}/a", **kw)
 
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        buf.seek(0)
+    # ============================
+    # INTERACTIVE CHARTS (Plotly)
+    # ============================
+    @http.route([
+        "/<string:instrument>/<string:view_type>/html",
+        "/<string:instrument>/<string:view_type>/html/<int:minutes_ago>",
+    ], type="http", auth="public", website=True)
+    def chart_html(self, instrument, view_type, minutes_ago=0, **kw):
+        """Zoomable chart drawn in the browser from the plotly curve data,
+        redrawn from the chart's event stream. ?points=N (default 1000)."""
+        return self._html_response(instrument, view_type, minutes_ago, **kw)
 
-        png_data = buf.getvalue()
+    @http.route("/<string:instrument>/<string:view_type>/a/html", type="http", auth="public", website=True)
+    def chart_html_all(self, instrument, view_type, **kw):
+        return self._html_response(instrument, f"{view_type}/a", **kw)
 
-        headers = [
-            ("Content-Type", "image/png"),
-            ("Cache-Control", "no-cache"),
-            ("Content-Disposition",
-             f'inline; filename="{instrument}_{original_view_type}_all.png"'),
-            ("Refresh", refresh_interval * 5),
-        ]
-        return request.make_response(png_data, headers=headers)
\ No newline at end of file
+    # ============================
+    # LIVE UPDATES (Server-Sent Events)
+    # ============================
+    @http.route([
+        "/<string:instrument>/<string:view_type>/events",
+        "/<string:instrument>/<string:view_type>/events/<int:minutes_ago>",
+    ], type="http", auth="public", website=True)
+    def chart_event_stream(self, instrument, view_type, minutes_ago=0, **kw):
+        """Events when /<instrument>/<view_type> changes, see _events_response.
+
+        ?format=png (default, the new ETag), json or plotly (the curves).
+        """
+        return self._events_response(instrument, view_type, minutes_ago, **kw)
+
+    @http.route("/<string:instrument>/<string:view_type>/a/events", type="http", auth="public", website=True)
+    def chart_event_stream_all(self, instrument, view_type, **kw):
+        return self._events_response(instrument, f"{view_type}/a", **kw)
+
+    @http.route([
+        "/<string:instrument>/<string:view_type>/live",
+        "/<string:instrument>/<string:view_type>/live/<int:minutes_ago>",
+    ], type="http", auth="public", website=True)
+    def chart_live(self, instrument, view_type, minutes_ago=0):
+        """The chart PNG, reloaded only when its event stream reports a new ETag."""
+        return self._live_response(instrument, view_type, minutes_ago)
+
+    @http.route("/<string:instrument>/<string:view_type>/a/live", type="http", auth="public", website=True)
+    def chart_live_all(self, instrument, view_type):
+        return self._live_response(instrument, f"{view_type}/a")
+
+    def _live_response(self, instrument, chart, minutes_ago=0):
+        Chart = request.env['dankbit.chart'].sudo()
+        return request.render("dankbit.chart_live", {
+            "title": f"{instrument} {chart}",
+            "png_url": Chart._chart_url(instrument, chart, minutes_ago),
+            "events_url": Chart._chart_url(instrument, chart, minutes_ago, "events"),
+        })
+
+    @http.route("/dankbit/plotly.min.js", type="http", auth="public")
+    def plotly_js(self, **kw):
+        """plotly.js from the installed plotly package; the URL carries its version."""
+        js = curve_data.plotly_js()
+        if js is None:
+            return request.not_found()
+        return request.make_response(js, headers=[
+            ("Content-Type", "application/javascript; charset=utf-8"),
+            ("Cache-Control", "public, max-age=31536000, immutable"),
+        ])
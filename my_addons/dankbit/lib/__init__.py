@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+# Chart computation shared by models, controllers and wizards; nothing here
+# imports from those packages.
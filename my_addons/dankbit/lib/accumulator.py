@@ -0,0 +1,236 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import greeks, options
+from .payoff import PayoffCurve
+
+# Risk-free rate of the chart greeks.
+RISK_FREE_RATE = 0.05
+DEFAULT_MAX_ENTRIES = 32
+# Time buckets of PrefixCurves, and the longest window they serve.
+BUCKET_SECONDS = 60
+MAX_WINDOW_MINUTES = 24 * 60
+
+
+def evaluate(trades, STs, settings):
+    """(payoffs, deltas, gammas) of a greeks.TradeColumns over the grid STs."""
+    curve = PayoffCurve()
+    if len(trades):
+        curve.add(trades.strike, trades.premium / trades.count, trades.sign * trades.count,
+                  trades.is_call)
+    deltas, gammas = greeks.trade_greeks(STs, trades, RISK_FREE_RATE, settings)
+    return curve(STs), deltas, gammas
+
+
+class CurveAccumulator:
+    """Payoff, delta and gamma curves of a growing set of trades.
+
+    A trade adds a fixed amount to every curve as long as the price grid,
+    the greek settings and its days to expiry (a UTC date) stay the same,
+    so new trades are simply added on top. Whoever owns the accumulator
+    keys it on those and calls reset() when the trades were not a pure
+    extension (deletions, ids committed out of order). Only the curves
+    are kept, so memory does not grow with the number of trades.
+
+    `watermark` is the newest trade id added, `trade_count` the number of
+    trades and `peak_chunk` the most rows added at once since the last
+    reset. Use `lock` around reading and extending it.
+    """
+
+    def __init__(self, name, settings):
+        self.name = name
+        self.lock = threading.Lock()
+        self.reset(settings)
+
+    def reset(self, settings):
+        # empty strategy: the price grid and ChartCurves of the chart
+        self.strat = options.OptionStrat(self.name, 0.0, settings.from_price,
+                                         settings.to_price, settings.steps)
+        self.payoffs = np.zeros(self.strat.STs.size)
+        self.deltas = np.zeros(self.strat.STs.size)
+        self.gammas = np.zeros(self.strat.STs.size)
+        self.watermark = 0
+        self.trade_count = 0
+        self.peak_chunk = 0
+
+    @property
+    def nbytes(self):
+        return self.payoffs.nbytes + self.deltas.nbytes + self.gammas.nbytes
+
+    def add(self, trades, settings, watermark=0):
+        """Add a greeks.TradeColumns holding the trades up to `watermark`."""
+        if len(trades):
+            payoffs, deltas, gammas = evaluate(trades, self.strat.STs, settings)
+            self.payoffs += payoffs
+            self.deltas += deltas
+            self.gammas += gammas
+            self.trade_count += trades.trade_count
+            self.peak_chunk = max(self.peak_chunk, len(trades))
+        self.watermark = max(self.watermark, watermark)
+
+    def curves(self, index_price, view_type, title, settings):
+        """render.ChartCurves of the current state; safe to keep after the
+        accumulator moves on."""
+        self.strat.S0 = index_price
+        return self.strat.curves(index_price, self.deltas.copy(), self.gammas.copy(),
+                                 view_type, title, settings, trade_count=self.trade_count,
+                                 payoffs=self.payoffs.copy())
+
+
+class PrefixCurves:
+    """Per-minute cumulative payoff, delta and gamma curves of one chart.
+
+    The trades since `origin` (epoch seconds on a bucket boundary) are
+    summed per BUCKET_SECONDS bucket of their deribit_ts, and prefix row k
+    holds the sum of the buckets before boundary origin + k * bucket, so a
+    window from any boundary to now is the last prefix row minus another.
+    window() returns that difference plus the boundary it starts on; the
+    trades between the window start and that boundary are left to the
+    caller. Only the prefix rows are stored; new trades update the rows
+    after their bucket in place, which for the current minute is one row.
+    """
+
+    def __init__(self, name, settings, origin, bucket_seconds=BUCKET_SECONDS):
+        self.name = name
+        self.bucket_seconds = bucket_seconds
+        self.lock = threading.Lock()
+        self.reset(settings, origin)
+
+    def reset(self, settings, origin=None):
+        """Drop all trades, moving the origin back to `origin` if given."""
+        self.strat = options.OptionStrat(self.name, 0.0, settings.from_price,
+                                         settings.to_price, settings.steps)
+        if origin is not None:
+            self.origin = origin - origin % self.bucket_seconds
+        # rows 0..n of payoffs, deltas, gammas over the grid and trade counts;
+        # rows past n are spare capacity
+        self._prefix = np.zeros((1, 3, self.strat.STs.size))
+        self._prefix_counts = np.zeros(1, dtype=np.int64)
+        self._n = 0
+        self.watermark = 0
+        self.trade_count = 0
+        self.peak_chunk = 0
+
+    @property
+    def nbytes(self):
+        return self._prefix.nbytes + self._prefix_counts.nbytes
+
+    def _grow(self, size):
+        """Extend to `size` buckets; new prefix rows repeat the last one."""
+        if size <= self._n:
+            return
+        if size >= len(self._prefix_counts):
+            # room for another hour, so the arrays are not copied every minute
+            capacity = size + 1 + 3600 // self.bucket_seconds
+            prefix = np.empty((capacity,) + self._prefix.shape[1:])
+            prefix[:self._n + 1] = self._prefix[:self._n + 1]
+            counts = np.empty(capacity, dtype=np.int64)
+            counts[:self._n + 1] = self._prefix_counts[:self._n + 1]
+            self._prefix, self._prefix_counts = prefix, counts
+        self._prefix[self._n + 1:size + 1] = self._prefix[self._n]
+        self._prefix_counts[self._n + 1:size + 1] = self._prefix_counts[self._n]
+        self._n = size
+
+    def add(self, trades, settings, watermark=0):
+        """Add a greeks.TradeColumns loaded with `bucket_seconds` buckets."""
+        if len(trades):
+            index = trades.bucket - self.origin // self.bucket_seconds
+            if index.min() < 0:
+                raise ValueError("trades before the origin of the prefix curves")
+            self._grow(int(index.max()) + 1)
+            order = np.argsort(index, kind="stable")
+            index = index[order]
+            first = int(index[0])
+            # per-bucket sums of the chunk's span, turned into prefix increments
+            span = np.zeros((int(index[-1]) - first + 1,) + self._prefix.shape[1:])
+            span_counts = np.zeros(len(span), dtype=np.int64)
+            starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+            for start, end in zip(starts, np.r_[starts[1:], index.size]):
+                rows = trades.take(order[start:end])
+                k = index[start] - first
+                span[k] = np.stack(evaluate(rows, self.strat.STs, settings))
+                span_counts[k] = rows.trade_count
+            np.cumsum(span, axis=0, out=span)
+            np.cumsum(span_counts, out=span_counts)
+            last = first + len(span)
+            self._prefix[first + 1:last + 1] += span
+            self._prefix[last + 1:self._n + 1] += span[-1]
+            self._prefix_counts[first + 1:last + 1] += span_counts
+            self._prefix_counts[last + 1:self._n + 1] += span_counts[-1]
+            self.trade_count += trades.trade_count
+            self.peak_chunk = max(self.peak_chunk, len(trades))
+        self.watermark = max(self.watermark, watermark)
+
+    def trim(self, origin):
+        """Drop the buckets before `origin` (rounded down to a boundary)."""
+        drop = min((origin - self.origin) // self.bucket_seconds, self._n)
+        if drop <= 0:
+            return
+        n = self._n - drop
+        self.trade_count -= int(self._prefix_counts[drop])
+        base = self._prefix[drop].copy()
+        self._prefix[:n + 1] = self._prefix[drop:self._n + 1]
+        self._prefix[:n + 1] -= base
+        base_count = self._prefix_counts[drop]
+        self._prefix_counts[:n + 1] = self._prefix_counts[drop:self._n + 1]
+        self._prefix_counts[:n + 1] -= base_count
+        self._n = n
+        self.origin += drop * self.bucket_seconds
+
+    def window(self, start):
+        """Curves of the trades from the first boundary at or after `start`
+        (epoch seconds) on: (boundary, payoffs, deltas, gammas, trade_count)."""
+        n = self._n
+        k = min(max(-(-(start - self.origin) // self.bucket_seconds), 0), n)
+        payoffs, deltas, gammas = self._prefix[n] - self._prefix[k]
+        trade_count = int(self._prefix_counts[n] - self._prefix_counts[k])
+        return self.origin + k * self.bucket_seconds, payoffs, deltas, gammas, trade_count
+
+    def curves(self, index_price, view_type, title, settings, payoffs, deltas, gammas, trade_count):
+        self.strat.S0 = index_price
+        return self.strat.curves(index_price, deltas, gammas, view_type, title, settings,
+                                 trade_count=trade_count, payoffs=payoffs)
+
+
+class AccumulatorCache:
+    """Thread-safe LRU of CurveAccumulators / PrefixCurves, bounded by entry
+    count and, with `max_bytes`, by the total size of their arrays.
+
+    Keys hold everything an accumulator's contributions depend on, so a
+    change of settings, grid, window start or UTC day starts a new one and
+    the old one ages out. Sizes are checked on get(), so the bound can be
+    exceeded by what the entries grew since.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        """The accumulator for `key`, created by calling `factory` on a miss."""
+        with self._lock:
+            acc = self._entries.get(key)
+            if acc is None:
+                acc = self._entries[key] = factory()
+            else:
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.max_bytes is not None:
+                total = sum(entry.nbytes for entry in self._entries.values())
+                while total > self.max_bytes and len(self._entries) > 1:
+                    total -= self._entries.popitem(last=False)[1].nbytes
+            return acc
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+ACCUMULATORS = AccumulatorCache()
+# A day of minute buckets is 1441 prefix rows of 3 curves over the grid.
+PREFIX_CURVES = AccumulatorCache(max_entries=16, max_bytes=256 * 1024 * 1024)
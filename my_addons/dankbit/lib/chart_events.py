@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""New-trade notifications for live chart streams.
+
+Ingestion calls notify() after its transaction commits; every Odoo
+process runs one listener thread (started by the first chart stream) that
+LISTENs on the channel and wakes the streams waiting in TRADE_EVENTS.wait.
+Like Odoo's bus, the NOTIFY goes through the "postgres" database, so one
+listener serves every database of the server.
+"""
+import collections
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+import odoo
+
+_logger = logging.getLogger(__name__)
+
+CHANNEL = "dankbit_trades"
+# NOTIFY payloads are limited to 8000 bytes; longer name lists are sent as
+# None, which streams treat as "any instrument may have changed".
+MAX_PAYLOAD = 7000
+SELECT_TIMEOUT = 50
+
+
+def notify(dbname, names):
+    """Announce new trades of the instruments `names` in `dbname`."""
+    payload = json.dumps({"db": dbname, "names": sorted(names)})
+    if len(payload) > MAX_PAYLOAD:
+        payload = json.dumps({"db": dbname, "names": None})
+    try:
+        with odoo.sql_db.db_connect("postgres").cursor() as cr:
+            cr.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+    except Exception:
+        # the trades are committed already; streams catch up on their next check
+        _logger.warning("Could not notify chart streams of new trades", exc_info=True)
+
+
+def matches(instrument, names):
+    """Whether trades named `names` (None: unknown) can belong to `instrument`.
+
+    A superset of dankbit.trade._instrument_domain; false positives only
+    cost the stream a chart key lookup.
+    """
+    if names is None:
+        return True
+    needle = str(instrument).upper()
+    return any(needle in name.upper() for name in names)
+
+
+class TradeEvents:
+    """Process-wide LISTEN on CHANNEL, fanned out to waiting threads."""
+
+    def __init__(self, history=256):
+        self._cond = threading.Condition()
+        # (seq, dbname, names) of the most recent notifications
+        self._history = collections.deque(maxlen=history)
+        self._seq = 0
+        self._pid = None
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def _ensure_listener(self):
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, name=f"{__name__}.TradeEvents", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                _logger.exception("Trade notification listener failed, reconnecting")
+                time.sleep(SELECT_TIMEOUT / 10)
+
+    def _listen(self):
+        with odoo.sql_db.db_connect("postgres").cursor() as cr:
+            conn = cr._cnx
+            cr.execute(f"LISTEN {CHANNEL}")
+            cr.commit()
+            _logger.info("Listening for new trades on %s", CHANNEL)
+            while True:
+                if select.select([conn], [], [], SELECT_TIMEOUT) == ([], [], []):
+                    continue
+                conn.poll()
+                payloads = [json.loads(n.payload) for n in conn.notifies]
+                conn.notifies.clear()
+                if payloads:
+                    self._publish(payloads)
+
+    def _publish(self, payloads):
+        with self._cond:
+            for payload in payloads:
+                self._seq += 1
+                self._history.append((self._seq, payload.get("db"), payload.get("names")))
+            self._cond.notify_all()
+
+    def wait(self, seq, timeout):
+        """Block until notifications newer than `seq` arrive or `timeout` passes.
+
+        Returns the current sequence number and the (dbname, names) pairs
+        published after `seq`. Notifications that already fell out of the
+        history are reported as (None, None).
+        """
+        self._ensure_listener()
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq, timeout)
+            events = [(db, names) for s, db, names in self._history if s > seq]
+            if self._seq - seq > len(events):
+                events.append((None, None))
+            return self._seq, events
+
+
+TRADE_EVENTS = TradeEvents()
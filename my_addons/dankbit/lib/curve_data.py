@@ -0,0 +1,156 @@
+import json
+
+import numpy as np
+
+from .render import plot_series
+
+try:
+    import plotly
+    import plotly.offline
+except ImportError:  # pragma: no cover
+    plotly = None
+
+# Used when the plotly package (and its bundled plotly.js) is missing.
+PLOTLY_CDN_URL = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Packed float32 layout: a header of HEADER_FIELDS values followed by
+# the SERIES arrays, each `points` long, all little-endian float32.
+HEADER_FIELDS = ("points", "index_price", "gamma_peak", "zero_delta_band", "trade_count")
+SERIES = ("STs", "payoffs", "market_deltas", "market_gammas")
+
+FORMATS = {
+    "json": "application/json",
+    "f32": "application/octet-stream",
+    "plotly": "application/json",
+}
+
+
+def downsample_indices(n, points):
+    """Evenly spaced indices keeping the first and last point; all when points <= 0."""
+    if points <= 0 or points >= n:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, points).round().astype(int))
+
+
+def summarize(curves, points=0):
+    """Plain dict with the curve arrays (optionally downsampled) and chart markers.
+
+    The gamma peak and zero-delta band are taken from the full grid, so
+    they match the PNG even when the arrays are thinned out.
+    """
+    deltas = np.asarray(curves.market_deltas, dtype=float)
+    gammas = np.asarray(curves.market_gammas, dtype=float)
+    idx = downsample_indices(curves.STs.size, points)
+
+    gamma_peak = None
+    if gammas.size:
+        peak = int(np.argmax(np.abs(gammas)))
+        if gammas[peak]:
+            gamma_peak = float(curves.STs[peak])
+
+    return {
+        "name": curves.name,
+        "view_type": curves.view_type,
+        "title": curves.title,
+        "index_price": float(curves.index_price),
+        "gamma_peak": gamma_peak,
+        "zero_delta_band": float(np.max(np.abs(deltas)) * 0.05) if deltas.size else 0.0,
+        "trade_count": curves.trade_count,
+        "STs": np.asarray(curves.STs, dtype=float)[idx],
+        "payoffs": np.asarray(curves.payoffs, dtype=float)[idx],
+        "market_deltas": deltas[idx],
+        "market_gammas": gammas[idx],
+    }
+
+
+def to_json(data):
+    return json.dumps({
+        key: np.round(value, 6).tolist() if isinstance(value, np.ndarray) else value
+        for key, value in data.items()
+    }, separators=(",", ":")).encode()
+
+
+def to_float32(data):
+    header = [data["STs"].size] + [
+        np.nan if data[field] is None else data[field] for field in HEADER_FIELDS[1:]
+    ]
+    return np.concatenate(
+        [np.asarray(header, dtype="<f4")] + [data[name].astype("<f4") for name in SERIES]
+    ).tobytes()
+
+
+def to_plotly(curves, points=0):
+    """Plotly figure (plain dict) showing the same lines and markers as the PNG."""
+    data = summarize(curves, points)
+    idx = downsample_indices(curves.STs.size, points)
+    x = data["STs"].round(6).tolist()
+
+    traces = []
+    ys = []
+    _md, _mg, series = plot_series(curves)
+    for y, color, label in series:
+        y = np.asarray(y, dtype=float)[idx]
+        ys.append(y)
+        traces.append({"type": "scatter", "mode": "lines", "name": label,
+                       "x": x, "y": y.round(6).tolist(), "line": {"color": color}})
+    y = np.concatenate(ys) if ys else np.zeros(1)
+    ymax = float(np.max(np.abs(y))) * 1.05 or 1.0
+
+    peak = data["gamma_peak"]
+    if peak is not None:
+        traces.append({"type": "scatter", "mode": "lines", "name": f"Gamma Peak {peak:.0f}",
+                       "x": [peak, peak], "y": [-ymax, ymax], "line": {"color": "orange"},
+                       "hoverinfo": "skip"})
+
+    band = data["zero_delta_band"]
+    layout = {
+        "title": {"text": f"{curves.name} | {curves.timestamp} | {curves.title}"},
+        "xaxis": {"title": {"text": f"${curves.S0:,.0f}", "font": {"color": "blue"}}},
+        "yaxis": {"range": [-ymax, ymax], "zeroline": False},
+        "hovermode": "x unified",
+        "legend": {"x": 1, "xanchor": "right", "y": 1, "bgcolor": "rgba(255,255,255,0.85)"},
+        # keep the viewer's zoom and pan when the data is refreshed
+        "uirevision": "keep",
+        "shapes": [
+            {"type": "rect", "xref": "paper", "x0": 0, "x1": 1, "y0": -band, "y1": band,
+             "fillcolor": "yellow", "opacity": 0.2, "line": {"width": 0}, "layer": "below"},
+            {"type": "line", "xref": "paper", "x0": 0, "x1": 1, "y0": 0, "y1": 0,
+             "line": {"color": "black", "width": 1}},
+            {"type": "line", "yref": "paper", "x0": data["index_price"], "x1": data["index_price"],
+             "y0": 0, "y1": 1, "line": {"color": "blue"}},
+        ],
+        "annotations": [
+            {"xref": "paper", "yref": "paper", "x": 0.01, "y": 0.02, "showarrow": False,
+             "xanchor": "left", "text": f"{curves.trade_count} trades"
+             if curves.trade_count is not None else ""},
+            {"xref": "paper", "yref": "paper", "x": 0.99, "y": 0.02, "showarrow": False,
+             "xanchor": "right", "text": "<b>Dankbit™</b>",
+             "font": {"color": "#6c2bd9", "size": 16, "family": "monospace"}, "opacity": 0.5},
+        ],
+    }
+    return {"data": traces, "layout": layout}
+
+
+def plotly_js():
+    """The plotly.js bundle shipped with the plotly package, or None."""
+    return plotly.offline.get_plotlyjs() if plotly else None
+
+
+def plotly_js_url():
+    if plotly is None:
+        return PLOTLY_CDN_URL
+    return f"/dankbit/plotly.min.js?v={plotly.__version__}"
+
+
+def script_json(obj):
+    """JSON that is safe to embed in an HTML <script> element."""
+    return (json.dumps(obj, separators=(",", ":"))
+            .replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026"))
+
+
+def encode(curves, fmt, points=0):
+    """Serialize curves as "json", packed "f32" or a "plotly" figure."""
+    if fmt == "plotly":
+        return json.dumps(to_plotly(curves, points), separators=(",", ":")).encode()
+    data = summarize(curves, points)
+    return to_json(data) if fmt == "json" else to_float32(data)
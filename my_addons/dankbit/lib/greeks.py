@@ -0,0 +1,129 @@
+import numpy as np
+from scipy.special import ndtr
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Trades evaluated per broadcast pass; bounds the (chunk x grid) temporaries.
+CHUNK_SIZE = 2048
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def portfolio_greeks(S, strikes, T, iv, signed_qty, is_call,
+                     r=0.0, min_time_hours=1.0, chunk_size=CHUNK_SIZE):
+    """Portfolio delta and gamma over the price grid S in one pass.
+
+    strikes, T (years), iv (fraction), signed_qty and is_call are arrays
+    with one entry per position. Matches the per-trade Black-Scholes delta
+    and gamma summed over the trades (see tests/test_greeks.py), including
+    the min-time and min-vol regularization, but shares log(S/K) and
+    sigma*sqrt(T) between both greeks and works on `chunk_size` positions
+    at a time.
+    """
+    S = np.asarray(S, dtype=float)
+    if S.ndim == 0:
+        delta, gamma = portfolio_greeks(S[None], strikes, T, iv, signed_qty, is_call,
+                                        r, min_time_hours, chunk_size)
+        return delta[0], gamma[0]
+    delta = np.zeros_like(S)
+    gamma = np.zeros_like(S)
+
+    strikes = np.asarray(strikes, dtype=float)
+    n = strikes.size
+    if not n:
+        return delta, gamma
+
+    eps_years = min_time_hours / (24.0 * 365.0)
+    T_eff = np.maximum(np.asarray(T, dtype=float), eps_years)
+    sigma = np.maximum(np.asarray(iv, dtype=float), 1e-4)
+    qty = np.asarray(signed_qty, dtype=float)
+    puts = ~np.asarray(is_call, dtype=bool)
+    log_S = np.log(S)
+
+    for start in range(0, n, chunk_size):
+        sl = slice(start, start + chunk_size)
+        sig_sqrt_t = sigma[sl] * np.sqrt(T_eff[sl])
+        log_sk = log_S[None, :] - np.log(strikes[sl])[:, None]
+
+        # delta uses the Black-Scholes d1; gamma keeps its own drift term
+        # (0.044 * sigma^2), i.e. d1_gamma = d1 - 0.456 * sigma * sqrt(T).
+        d1 = (log_sk + ((r + 0.5 * sigma[sl] ** 2) * T_eff[sl])[:, None]) / sig_sqrt_t[:, None]
+        delta += qty[sl] @ ndtr(d1) - np.sum(qty[sl][puts[sl]])
+
+        d1 -= (0.456 * sig_sqrt_t)[:, None]
+        gamma += (qty[sl] / sig_sqrt_t) @ (np.exp(-0.5 * d1 * d1) * _INV_SQRT_2PI)
+
+    gamma /= S
+    return delta, gamma
+
+
+class TradeColumns:
+    """Contiguous per-trade arrays used by the greek and payoff code.
+
+    strike, days_to_expiry, iv (percent), amount, sign (+1 buy / -1 sell),
+    is_call, premium (price * index_price), count and bucket (time bucket
+    number, when loaded with one), one entry per trade or, when loaded
+    aggregated, per group of `count` similar trades with summed amount and
+    premium.
+    """
+    __slots__ = ("strike", "days_to_expiry", "iv", "amount", "sign", "is_call", "premium", "count",
+                 "bucket")
+
+    def __init__(self, strike=(), days_to_expiry=(), iv=(), amount=(), sign=(), is_call=(),
+                 premium=(), count=None, bucket=None):
+        self.strike = np.asarray(strike, dtype=float)
+        self.days_to_expiry = np.asarray(days_to_expiry, dtype=float)
+        self.iv = np.asarray(iv, dtype=float)
+        self.amount = np.asarray(amount, dtype=float)
+        self.sign = np.asarray(sign, dtype=float)
+        self.is_call = np.asarray(is_call, dtype=bool)
+        self.premium = np.asarray(premium, dtype=float)
+        if count is None:
+            count = np.ones(self.strike.size, dtype=int)
+        self.count = np.asarray(count, dtype=int)
+        if bucket is None:
+            bucket = np.zeros(self.strike.size, dtype=np.int64)
+        self.bucket = np.asarray(bucket, dtype=np.int64)
+
+    def __len__(self):
+        return self.strike.size
+
+    @property
+    def trade_count(self):
+        return int(self.count.sum())
+
+    def take(self, index):
+        """TradeColumns with the rows selected by `index` (mask, slice or indices)."""
+        return TradeColumns(*(getattr(self, name)[index] for name in self.__slots__))
+
+    @classmethod
+    def concat(cls, parts):
+        """One TradeColumns with the rows of all `parts`."""
+        return cls(*(np.concatenate([getattr(part, name) for part in parts])
+                     for name in cls.__slots__))
+
+    @classmethod
+    def from_records(cls, trades):
+        n = len(trades)
+        cols = cls(np.empty(n), np.empty(n), np.empty(n), np.empty(n),
+                   np.empty(n), np.empty(n, dtype=bool), np.empty(n))
+        for i, trd in enumerate(trades):
+            cols.strike[i] = trd.strike
+            cols.days_to_expiry[i] = trd.days_to_expiry
+            cols.iv[i] = trd.iv
+            cols.amount[i] = trd.amount
+            cols.sign[i] = -1.0 if trd.direction == "sell" else 1.0
+            cols.is_call[i] = trd.option_type == "call"
+            cols.premium[i] = trd.price * trd.index_price
+        return cols
+
+
+def trade_greeks(S, trades, r=0.0, settings=None):
+    """Portfolio (delta, gamma) for TradeColumns or a trade recordset."""
+    mock_0dte = settings.mock_0dte if settings else False
+    min_time_hours = settings.greeks_min_time_hours if settings else 1.0
+    cols = trades if isinstance(trades, TradeColumns) else TradeColumns.from_records(trades)
+    T = np.zeros_like(cols.days_to_expiry) if mock_0dte else cols.days_to_expiry / 365
+    return portfolio_greeks(S, cols.strike, T, cols.iv / 100, cols.sign * cols.amount,
+                            cols.is_call, r=r, min_time_hours=min_time_hours)
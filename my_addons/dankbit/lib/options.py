@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+
+from . import render
+from .payoff import PayoffCurve
+from .render import ChartCurves
+
+
+_logger = logging.getLogger(__name__)
+
+class Option:
+    def __init__(self, type_, K, price, direction):
+        self.type = type_
+        self.K = K
+        self.price = price
+        self.direction = direction
+    
+    def __repr__(self):
+        direction = 'long' if self.direction == 1 else 'short'
+        return f'Option(type={self.type},K={self.K}, price={self.price},direction={direction})'
+
+
+LEDGER_DTYPE = np.dtype([
+    ("is_call", bool),
+    ("K", float),
+    ("price", float),
+    ("direction", np.int8),
+    ("quantity", float),
+])
+
+
+class OptionLedger:
+    """Array-backed list of the options in an OptionStrat.
+
+    One structured row (is_call, K, price, direction, quantity) per added
+    position, so memory grows with the number of trades rather than with
+    the contract quantity. Iterating yields Option objects, each repeated
+    `quantity` times like the old Q-fold list, and len() is the total
+    number of contracts.
+    """
+    __slots__ = ("_data", "_size")
+
+    def __init__(self, capacity=64):
+        self._data = np.empty(capacity, dtype=LEDGER_DTYPE)
+        self._size = 0
+
+    def _reserve(self, n):
+        needed = self._size + n
+        if needed > self._data.size:
+            data = np.empty(max(needed, 2 * self._data.size), dtype=LEDGER_DTYPE)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    def append(self, type_, K, price, direction, Q=1):
+        self._reserve(1)
+        self._data[self._size] = (type_ == 'call', K, price, direction, Q)
+        self._size += 1
+
+    def extend(self, is_call, K, price, direction, Q):
+        """Append many rows at once from equally long arrays."""
+        K = np.asarray(K, dtype=float)
+        n = K.size
+        self._reserve(n)
+        rows = self._data[self._size:self._size + n]
+        rows["is_call"] = is_call
+        rows["K"] = K
+        rows["price"] = price
+        rows["direction"] = direction
+        rows["quantity"] = Q
+        self._size += n
+
+    @property
+    def rows(self):
+        """Structured array view of the ledger, one row per position."""
+        return self._data[:self._size]
+
+    def __len__(self):
+        return int(self.rows["quantity"].sum())
+
+    def __iter__(self):
+        for is_call, K, price, direction, Q in self.rows.tolist():
+            o = Option('call' if is_call else 'put', K, price, direction)
+            for _ in range(int(Q)):
+                yield o
+
+    def net_quantity_by_strike(self):
+        """(strikes, net signed quantity) with strikes sorted ascending."""
+        rows = self.rows
+        strikes, inverse = np.unique(rows["K"], return_inverse=True)
+        net = np.bincount(inverse, weights=rows["direction"] * rows["quantity"],
+                          minlength=strikes.size)
+        return strikes, net
+
+
+class OptionStrat:
+    def __init__(self, name, S0, from_price, to_price, step):
+        self.name = name
+        self.S0 = S0
+        self.STs = np.arange(from_price, to_price, step)
+        # payoffs, longs and shorts are evaluated from their legs on demand
+        self._payoff_curve = PayoffCurve()
+        self._longs_curve = PayoffCurve()
+        self._shorts_curve = PayoffCurve()
+        self.instruments = OptionLedger()
+
+    @property
+    def payoffs(self):
+        return self._payoff_curve(self.STs)
+
+    @property
+    def longs(self):
+        return self._longs_curve(self.STs)
+
+    @property
+    def shorts(self):
+        return self._shorts_curve(self.STs)
+
+    def breakevens(self):
+        """Exact prices where the combined expiry P&L crosses zero."""
+        return self._payoff_curve.breakevens()
+           
+    def long_call(self, K, C, Q=1):
+        self._payoff_curve.add(K, C, Q, True)
+        self._add_to_self('call', K, C, 1, Q)
+    
+    def short_call(self, K, C, Q=1):
+        self._payoff_curve.add(K, C, -Q, True)
+        self._add_to_self('call', K, C, -1, Q)
+    
+    def long_put(self, K, P, Q=1):
+        self._payoff_curve.add(K, P, Q, False)
+        self._add_to_self('put', K, P, 1, Q)
+      
+    def short_put(self, K, P, Q=1):
+        self._payoff_curve.add(K, P, -Q, False)
+        self._add_to_self('put', K, P, -1, Q)
+
+    def add_trades(self, trades):
+        """Add every row of a greeks.TradeColumns: buys long, sells short.
+        Aggregated rows add `count` contracts at the average premium."""
+        if not len(trades):
+            return
+        premiums = trades.premium / trades.count
+        self._payoff_curve.add(trades.strike, premiums, trades.sign * trades.count, trades.is_call)
+        self.instruments.extend(trades.is_call, trades.strike, premiums,
+                                np.where(trades.sign > 0, 1, -1), trades.count)
+
+    # --------------------------------------------------------------
+    # longs
+    def add_call_to_longs(self, K, C, Q=1):
+        self._longs_curve.add(K, C, Q, True)
+        self._add_to_self('call', K, C, 1, Q)
+
+    def add_put_to_longs(self, K, P, Q=1):
+        self._longs_curve.add(K, P, Q, False)
+        self._add_to_self('put', K, P, 1, Q)
+    # shorts
+    def add_call_to_shorts(self, K, C, Q=1):
+        self._shorts_curve.add(K, C, -Q, True)
+        self._add_to_self('call', K, C, -1, Q)
+
+    def add_put_to_shorts(self, K, P, Q=1):
+        self._shorts_curve.add(K, P, -Q, False)
+        self._add_to_self('put', K, P, -1, Q)
+    # --------------------------------------------------------------
+    def _add_to_self(self, type_, K, price, direction, Q):
+        self.instruments.append(type_, K, price, direction, Q)
+
+    def curves(self, index_price, market_delta, market_gammas, view_type, plot_title,
+               settings=None, trade_count=None, payoffs=None):
+        """Collect what plot() draws into a render.ChartCurves; `payoffs`
+        replaces the payoff of the strategy's own legs."""
+        berlin_time = datetime.now(ZoneInfo("Europe/Berlin"))
+        return ChartCurves(
+            name=self.name,
+            S0=self.S0,
+            index_price=index_price,
+            STs=self.STs,
+            payoffs=self.payoffs if payoffs is None else np.asarray(payoffs, dtype=float),
+            market_deltas=np.asarray(market_delta, dtype=float),
+            market_gammas=np.asarray(market_gammas, dtype=float),
+            view_type=view_type,
+            title=plot_title,
+            timestamp=berlin_time.strftime("%Y-%m-%d %H:%M"),
+            gamma_plot_scale=settings.gamma_plot_scale if settings else 0.0,
+            trade_count=trade_count,
+        )
+
+    def plot(self, index_price, market_delta, market_gammas, view_type, plot_title, settings=None):
+        return render.draw(self.curves(index_price, market_delta, market_gammas,
+                                       view_type, plot_title, settings))
+
+    def add_dankbit_signature(self, ax, logo_path=None, alpha=0.5, fontsize=16, trade_count=None):
+        render.add_dankbit_signature(ax, logo_path, alpha, fontsize, trade_count)
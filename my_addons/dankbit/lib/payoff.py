@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class PayoffCurve:
+    """Expiry P&L of a book of vanilla options, kept as legs instead of
+    a grid array.
+
+    The payoff is piecewise linear with kinks only at strikes. Writing a
+    put as (K - S) + max(S - K, 0) gives
+
+        f(S) = a + b * S + sum_i q_i * max(S - K_i, 0)
+
+    so the strikes are sorted once and f is evaluated on any grid from the
+    cumulative sums of q and q * K: O(N log N + grid) instead of one
+    np.maximum pass over the grid per leg.
+    """
+
+    def __init__(self):
+        self._legs = []
+        self._compiled = None
+
+    def add(self, strikes, premiums, qty, is_call):
+        """Add legs. `qty` is signed (+ long, - short), premiums are per contract."""
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=float))
+        n = strikes.size
+        self._legs.append((
+            strikes,
+            np.broadcast_to(np.asarray(premiums, dtype=float), n),
+            np.broadcast_to(np.asarray(qty, dtype=float), n),
+            np.broadcast_to(np.asarray(is_call, dtype=bool), n),
+        ))
+        self._compiled = None
+
+    def _compile(self):
+        if self._compiled is None:
+            if self._legs:
+                K, C, q, calls = (np.concatenate(col) for col in zip(*self._legs))
+            else:
+                K, C, q, calls = np.empty(0), np.empty(0), np.empty(0), np.empty(0, dtype=bool)
+            self._legs = [(K, C, q, calls)]
+
+            puts = ~calls
+            a = np.dot(q[puts], K[puts]) - np.dot(q, C)
+            b = -np.sum(q[puts])
+            order = np.argsort(K, kind="stable")
+            strikes, q_sorted = K[order], q[order]
+            cum_q = np.concatenate(([0.0], np.cumsum(q_sorted)))
+            cum_qk = np.concatenate(([0.0], np.cumsum(q_sorted * strikes)))
+            self._compiled = (a, b, strikes, cum_q, cum_qk)
+        return self._compiled
+
+    def __call__(self, S):
+        """P&L at expiry for the price(s) S."""
+        a, b, strikes, cum_q, cum_qk = self._compile()
+        S = np.asarray(S, dtype=float)
+        # legs with K < S are in the money on the max(S - K, 0) side
+        idx = np.searchsorted(strikes, S, side="right")
+        return a + b * S + S * cum_q[idx] - cum_qk[idx]
+
+    def breakevens(self):
+        """Sorted prices S >= 0 where the expiry P&L is zero.
+
+        Solved per linear segment between consecutive strikes, so the
+        result does not depend on any grid. Stretches where the P&L is
+        flat at exactly zero are not reported.
+        """
+        a, b, strikes, cum_q, cum_qk = self._compile()
+        knots = np.unique(strikes)
+        # segment j covers [lo[j], hi[j]] and has the strikes below it summed in
+        idx = np.concatenate(([0], np.searchsorted(strikes, knots, side="right")))
+        lo = np.concatenate(([0.0], knots))
+        hi = np.concatenate((knots, [np.inf]))
+        intercept = a - cum_qk[idx]
+        slope = b + cum_q[idx]
+
+        sloped = slope != 0
+        roots = -intercept[sloped] / slope[sloped]
+        lo, hi = lo[sloped], hi[sloped]
+        tol = 1e-9 * np.maximum(1.0, np.abs(roots))
+        inside = (roots >= lo - tol) & (roots <= hi + tol)
+        # snap roots on a kink to the strike so both neighbours agree
+        roots = np.clip(roots[inside], lo[inside], hi[inside])
+        return np.unique(roots)
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""Chart drawing from precomputed curves.
+
+Only depends on NumPy and matplotlib (no Odoo, no relative imports) so the
+render worker processes of render_pool can load it on their own.
+"""
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import matplotlib.transforms as mtransforms
+from matplotlib.ticker import MultipleLocator
+import matplotlib.image as mpimg
+from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+import matplotlib.patheffects as path_effects
+
+
+SIGNATURE_COLOR = "#6c2bd9"
+
+
+@dataclass
+class ChartCurves:
+    """Everything needed to draw one chart, as plain arrays and values."""
+    name: str
+    S0: float
+    index_price: float
+    STs: np.ndarray
+    payoffs: np.ndarray
+    market_deltas: np.ndarray
+    market_gammas: np.ndarray
+    view_type: str
+    title: str
+    timestamp: str = ""
+    gamma_plot_scale: float = 0.0
+    trade_count: int | None = None
+
+
+def new_figure():
+    """An Agg figure that is not registered with pyplot (thread-safe)."""
+    fig = Figure(figsize=(18, 8))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def plot_series(curves):
+    """(md_arr, mg_arr, [(y, color, label), ...]) for the curves of a view."""
+    # compute plotting arrays for delta/gamma and scaled payoff
+    try:
+        md_arr = np.array(curves.market_deltas, dtype=float)
+    except Exception:
+        md_arr = np.array([0.0])
+    try:
+        mg_arr = np.array(curves.market_gammas, dtype=float)
+    except Exception:
+        mg_arr = np.array([0.0])
+
+    md_max = np.max(np.abs(md_arr)) if md_arr.size else 0.0
+    mg_max = np.max(np.abs(mg_arr)) if mg_arr.size else 0.0
+
+    # Config-driven gamma plotting magnification. If the config value
+    # is missing or 0, fall back to automatic scaling derived from md/mg.
+    cfg_val = curves.gamma_plot_scale
+    if cfg_val and cfg_val > 0:
+        gamma_scale = cfg_val
+    elif mg_max > 0:
+        gamma_scale = max(md_max, 1.0) / mg_max
+    else:
+        gamma_scale = 1.0
+
+    md_plot = md_arr.copy()
+    mg_plot = mg_arr * gamma_scale
+
+    max_signal = max(np.max(np.abs(md_plot)) if md_plot.size else 0.0,
+                     np.max(np.abs(mg_plot)) if mg_plot.size else 0.0,
+                     1.0)
+
+    payoffs = np.asarray(curves.payoffs, dtype=float)
+    payoff_abs_max = np.max(np.abs(payoffs)) if payoffs.size else 0.0
+    if payoff_abs_max > 0:
+        payoff_scaled = payoffs * (max_signal / payoff_abs_max)
+    else:
+        payoff_scaled = payoffs
+
+    view_type = curves.view_type
+    if view_type == "mm":  # for market maker
+        series = [(-md_plot, "green", "Delta"), (-mg_plot, "violet", "Gamma")]
+    elif view_type == "taker":
+        series = [(md_plot, "green", "Delta"), (mg_plot, "violet", "Gamma")]
+    elif view_type == "be_taker":
+        series = [(payoff_scaled, "red", "P&L"), (md_plot, "green", "Delta"),
+                  (mg_plot, "violet", "Gamma")]
+    elif view_type == "be_mm":
+        series = [(payoff_scaled, "red", "Taker P&L"), (-md_plot, "green", "Delta"),
+                  (-mg_plot, "violet", "Gamma")]
+    else:
+        series = []
+    return md_arr, mg_arr, series
+
+
+def _gamma_peak(STs, mg_arr):
+    """Price of the largest absolute gamma, or None when gamma is flat zero."""
+    if not mg_arr.size:
+        return None
+    idx = int(np.argmax(np.abs(mg_arr)))
+    return STs[idx] if mg_arr[idx] else None
+
+
+def _setup_axes(ax):
+    ax.xaxis.set_major_locator(MultipleLocator(50))  # Tick every 50
+    ax.tick_params(axis="x", labelrotation=90)
+    ax.set_yticks(list(range(-50000, 50001, 1000)))
+    ax.grid(True)
+
+
+def _set_limits(ax, STs, index_price, ys):
+    """Limits as autoscaling gives them: the data (prices and the index
+    line, the series values) plus margins, symmetric around zero for y."""
+    xmargin, ymargin = ax.margins()
+    if STs.size:
+        lo = min(STs.min(), index_price)
+        hi = max(STs.max(), index_price)
+        pad = (hi - lo) * xmargin
+        ax.set_xlim(mtransforms.nonsingular(lo - pad, hi + pad, expander=0.05))
+    y = np.concatenate(ys) if ys else np.zeros(1)
+    lo, hi = y.min(), y.max()
+    pad = (hi - lo) * ymargin
+    lo, hi = mtransforms.nonsingular(lo - pad, hi + pad, expander=0.05)
+    ymax = max(abs(lo), abs(hi))
+    ax.set_ylim(-ymax, ymax)
+
+
+def _zero_delta_zone(ax, md_arr):
+    # Zero-delta zone size
+    max_abs_delta = np.max(np.abs(md_arr)) if md_arr.size else 0.0
+    threshold = max_abs_delta * 0.05  # 5% of max delta
+    return ax.axhspan(-threshold, threshold, color="yellow", alpha=0.20)
+
+
+def _legend(ax, handles=None):
+    """The legend, forced into the top-right corner."""
+    if handles is None:
+        old_legend = ax.get_legend()
+        if old_legend:
+            # legendHandles was renamed to legend_handles in matplotlib 3.7
+            handles = (old_legend.legend_handles if hasattr(old_legend, "legend_handles")
+                       else old_legend.legendHandles)
+    if handles is not None:
+        legend = ax.legend(handles, [h.get_label() for h in handles],
+                           loc="upper right", framealpha=0.85)
+    else:
+        legend = ax.legend(loc="upper right", framealpha=0.85)
+    legend.get_frame().set_alpha(0.85)
+    return legend
+
+
+def _signature_position(ax, legend):
+    """Axes position of the signature: just left of the legend's top edge."""
+    # The legend lays itself out against the renderer; no full draw of
+    # the figure is needed to measure it.
+    lbbox = legend.get_window_extent(ax.figure.canvas.get_renderer())
+    lbbox_axes = ax.transAxes.inverted().transform_bbox(lbbox)
+
+    pad = 0.015    # small space between signature + legend
+    # clamp inside plot
+    return max(lbbox_axes.x0 - pad, 0.02), lbbox_axes.y1 - 0.01
+
+
+def _signature_text(ax, x, y, alpha=0.5, fontsize=16):
+    text = ax.text(
+        x, y,
+        "Dankbit™",
+        transform=ax.transAxes,
+        fontsize=fontsize,
+        color=SIGNATURE_COLOR,
+        alpha=alpha,
+        ha="right",
+        va="top",
+        fontweight="bold",
+        family="monospace",
+    )
+    text.set_path_effects([
+        path_effects.withStroke(linewidth=3, alpha=0.3, foreground="white")
+    ])
+    return text
+
+
+def draw(curves, fig=None, ax=None):
+    """Draw `curves` onto a new (or the given, empty) figure; returns (fig, ax)."""
+    if fig is None:
+        fig, ax = new_figure()
+    _setup_axes(ax)
+
+    STs = curves.STs
+    md_arr, mg_arr, series = plot_series(curves)
+    for y, color, label in series:
+        ax.plot(STs, y, color=color, label=label)
+
+    ax.set_title(f"{curves.name} | {curves.timestamp} | {curves.title}")
+
+    _set_limits(ax, STs, curves.index_price, [y for y, _color, _label in series])
+    _zero_delta_zone(ax, md_arr)
+
+    # Mark Gamma Peak
+    gamma_peak = _gamma_peak(STs, mg_arr)
+    if gamma_peak is not None:
+        ax.axvline(x=gamma_peak, color="orange", label=str(f"Gamma Peak {gamma_peak:.0f}"))
+
+    ax.axhline(0, color='black', linewidth=1, linestyle='-')
+    ax.axvline(x=curves.index_price, color="blue")
+
+    ax.set_xlabel(f"${curves.S0:,.0f}", fontsize=10, color="blue")
+    # Draw legend first so we can place the Dankbit signature beside it
+    ax.legend()
+    # add signature beside legend (or fallback to quiet corner)
+    add_dankbit_signature(ax)
+
+    if curves.trade_count is not None:
+        ax.text(
+            0.01, 0.02,
+            f"{curves.trade_count} trades",
+            transform=ax.transAxes,
+            fontsize=14,
+        )
+
+    return fig, ax
+
+
+class FigureTemplate:
+    """A figure kept alive between renders of one view type.
+
+    Axes, locators, the 101 fixed y ticks, grid, reference lines, curve
+    lines and texts are created once; render() only swaps line data, the
+    zero-delta zone, the gamma-peak marker, limits, legend and texts, then
+    saves. Not thread-safe: hold `lock` around render().
+    """
+
+    def __init__(self, view_type):
+        self.view_type = view_type
+        self.fig, self.ax = new_figure()
+        ax = self.ax
+        _setup_axes(ax)
+        ax.set_autoscale_on(False)
+
+        # created in the same order as draw() so they stack the same way
+        self.lines = {}
+        self.zone = None
+        self.peak = ax.axvline(x=0, color="orange", visible=False)
+        ax.axhline(0, color='black', linewidth=1, linestyle='-')
+        self.index_line = ax.axvline(x=0, color="blue")
+        self.count_text = ax.text(0.01, 0.02, "", transform=ax.transAxes, fontsize=14)
+        self.signature = _signature_text(ax, 0, 0)
+        self.lock = threading.Lock()
+
+    def _line(self, color, label):
+        line = self.lines.get(label)
+        if line is None:
+            line, = self.ax.plot([], [], color=color, label=label)
+            # keep curve lines below the reference lines like draw() does
+            line.set_zorder(1.9)
+            self.lines[label] = line
+        return line
+
+    def render(self, curves):
+        ax = self.ax
+        STs = curves.STs
+        md_arr, mg_arr, series = plot_series(curves)
+
+        handles = []
+        ys = []
+        for y, color, label in series:
+            line = self._line(color, label)
+            line.set_data(STs, y)
+            handles.append(line)
+            ys.append(y)
+
+        ax.set_title(f"{curves.name} | {curves.timestamp} | {curves.title}")
+        ax.set_xlabel(f"${curves.S0:,.0f}", fontsize=10, color="blue")
+
+        _set_limits(ax, STs, curves.index_price, ys)
+        if self.zone is not None:
+            self.zone.remove()
+        self.zone = _zero_delta_zone(ax, md_arr)
+
+        gamma_peak = _gamma_peak(STs, mg_arr)
+        self.peak.set_visible(gamma_peak is not None)
+        if gamma_peak is not None:
+            self.peak.set_xdata([gamma_peak, gamma_peak])
+            self.peak.set_label(f"Gamma Peak {gamma_peak:.0f}")
+            handles.append(self.peak)
+        self.index_line.set_xdata([curves.index_price, curves.index_price])
+
+        self.signature.set_position(_signature_position(ax, _legend(ax, handles)))
+
+        self.count_text.set_visible(curves.trade_count is not None)
+        self.count_text.set_text(f"{curves.trade_count} trades")
+
+        buf = BytesIO()
+        self.fig.savefig(buf, format="png")
+        return buf.getvalue()
+
+
+_TEMPLATES = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def figure_template(view_type):
+    """This process's FigureTemplate for `view_type`; take its lock to render."""
+    with _TEMPLATES_LOCK:
+        template = _TEMPLATES.get(view_type)
+        if template is None:
+            template = _TEMPLATES[view_type] = FigureTemplate(view_type)
+        return template
+
+
+def add_dankbit_signature(ax, logo_path=None, alpha=0.5, fontsize=16, trade_count=None):
+    """
+    Legend stays top-right.
+    Dankbit™ signature sits immediately to the LEFT of the legend, with minimal spacing.
+    Zero overlap, minimal distance.
+    """
+    sig_x, sig_y = _signature_position(ax, _legend(ax))
+
+    # --- Draw logo ---
+    if logo_path:
+        try:
+            img = mpimg.imread(logo_path)
+            imagebox = OffsetImage(img, zoom=0.07, alpha=alpha)
+            ab = AnnotationBbox(
+                imagebox,
+                (sig_x, sig_y),
+                xycoords="axes fraction",
+                frameon=False,
+                box_alignment=(1, 1),
+            )
+            ax.add_artist(ab)
+            return
+        except Exception:
+            pass
+
+    # --- Signature text ---
+    _signature_text(ax, sig_x, sig_y, alpha, fontsize)
+
+    # --- Trade count under signature ---
+    if trade_count is not None:
+        ax.text(
+            sig_x,
+            sig_y - 0.045,
+            f"{trade_count} trades",
+            transform=ax.transAxes,
+            fontsize=fontsize * 0.55,
+            color=SIGNATURE_COLOR,
+            alpha=alpha * 0.8,
+            ha="right",
+            va="top",
+            family="monospace",
+        )
+
+
+def render_png(curves, reuse=True):
+    """PNG bytes for `curves` (a ChartCurves or its fields as a dict).
+
+    Renders on the process's figure template for the view type unless
+    `reuse` is False or the template is in use by another thread, in which
+    case a fresh figure is drawn.
+    """
+    if isinstance(curves, dict):
+        curves = ChartCurves(**curves)
+    if reuse:
+        template = figure_template(curves.view_type)
+        # a thread that finds the template busy draws a fresh figure
+        # rather than queueing behind the other render
+        if template.lock.acquire(blocking=False):
+            try:
+                return template.render(curves)
+            finally:
+                template.lock.release()
+    fig, _ax = draw(curves)
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def init_worker():
+    """Render process initializer: select Agg and warm up font/text caches."""
+    matplotlib.use("Agg")
+    render_png(ChartCurves("", 0.0, 0.0, np.arange(2.0), np.zeros(2), np.zeros(2), np.zeros(2),
+                           "taker", ""))
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Pool of long-lived chart render processes.
+
+Web and cron workers compute ChartCurves and hand them to a pool of
+spawned processes that only run matplotlib (render.render_png), so the
+Odoo worker is not held by drawing and PNG encoding, and renders can use
+all cores. The queue is bounded: when it is full, or the pool is broken,
+the chart is rendered in the calling process instead. A render that
+times out raises RenderTimeout rather than being drawn a second time.
+"""
+import dataclasses
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from . import render
+
+_logger = logging.getLogger(__name__)
+
+# Spawned children do not have Odoo's addons path; they import the worker
+# entry points (and render.py through them) from this directory instead.
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_worker")
+WORKER_MODULE = "dankbit_render_worker"
+
+# How long a render waits for a free queue slot before drawing in-process.
+SLOT_TIMEOUT = 0.05
+
+_POOL = None
+_POOL_PID = None
+_POOL_SIZE = 0
+_SLOTS = None
+_LOCK = threading.Lock()
+
+
+class RenderTimeout(Exception):
+    """A pooled render did not finish within its timeout."""
+
+
+def _worker_module():
+    if WORKER_PATH not in sys.path:
+        sys.path.append(WORKER_PATH)
+    return importlib.import_module(WORKER_MODULE)
+
+
+def _get_pool(workers):
+    """The process-wide pool with `workers` processes (re-created after a fork)."""
+    global _POOL, _POOL_PID, _POOL_SIZE, _SLOTS
+    pid = os.getpid()
+    with _LOCK:
+        if _POOL is None or _POOL_PID != pid or _POOL_SIZE != workers:
+            if _POOL is not None and _POOL_PID == pid:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_module().init_worker,
+            )
+            _POOL_PID = pid
+            _POOL_SIZE = workers
+            # bounded queue: a few renders waiting per process at most
+            _SLOTS = threading.BoundedSemaphore(workers * 4)
+        return _POOL, _SLOTS
+
+
+def _discard_pool(pool):
+    global _POOL
+    with _LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_png(curves, workers=0, timeout=30.0):
+    """PNG bytes for a render.ChartCurves, drawn by the pool when `workers` > 0.
+
+    Raises RenderTimeout when the pool does not deliver within `timeout`
+    seconds; the render is not retried in-process, which would only double
+    the work on a host that is already behind.
+    """
+    if workers <= 0:
+        return render.render_png(curves)
+
+    pool, slots = _get_pool(workers)
+    if not slots.acquire(timeout=SLOT_TIMEOUT):
+        _logger.warning("Render queue full, rendering %s in-process", curves.name)
+        return render.render_png(curves)
+    try:
+        future = pool.submit(_worker_module().render_png, dataclasses.asdict(curves))
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise RenderTimeout(f"Render of {curves.name} timed out after {timeout}s") from None
+    except BrokenProcessPool:
+        _logger.warning("Render pool broke, restarting it")
+        _discard_pool(pool)
+    finally:
+        slots.release()
+    return render.render_png(curves)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Entry points of the render_pool worker processes.
+
+Spawned workers do not have Odoo's addons path, so render_pool puts this
+directory (which holds nothing else) on sys.path and the workers import
+this module by its top-level name. It loads ../render.py on its own;
+render.py does not depend on Odoo or on relative imports.
+"""
+import importlib.util
+import os
+import sys
+
+RENDER_NAME = "dankbit_chart_render"
+
+
+def _load_render():
+    module = sys.modules.get(RENDER_NAME)
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "render.py")
+        spec = importlib.util.spec_from_file_location(RENDER_NAME, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[RENDER_NAME] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def init_worker():
+    """Pool initializer: load render.py and warm up matplotlib."""
+    _load_render().init_worker()
+
+
+def render_png(curves):
+    """PNG bytes for the fields of a render.ChartCurves, as a dict."""
+    return _load_render().render_png(curves)
@@ -1,4 +1,10 @@
 # -*- coding: utf-8 -*-
 
 from . import trade
+from . import trade_rollup
 from . import res_config_settings
+from . import settings
+from . import ingest_cursor
+from . import trade_stream
+from . import chart_snapshot
+from . import chart
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from datetime import datetime, timezone, timedelta
+
+from markupsafe import Markup
+
+from odoo import api, fields, models
+
+from .settings import DankbitSettings
+from ..lib import curve_data, render_pool
+from ..lib.accumulator import (
+    ACCUMULATORS, MAX_WINDOW_MINUTES, PREFIX_CURVES, CurveAccumulator, PrefixCurves, evaluate,
+)
+from ..lib.chart_cache import CHART_CACHE, CHART_FLIGHTS, chart_etag
+
+_logger = logging.getLogger(__name__)
+
+# Seconds an index price is reused for; also the granularity at which
+# chart keys (and ETags) roll over when no trades arrive.
+INDEX_PRICE_TTL = 120
+
+# Single-letter taker charts: (name, extra domain)
+TAKER_CHARTS = {
+    "c": ("calls", [("option_type", "=", "call")]),
+    "p": ("puts", [("option_type", "=", "put")]),
+    "b": ("buys", [("direction", "=", "buy")]),
+    "s": ("sells", [("direction", "=", "sell")]),
+}
+
+
+def _internal_view_type(view_type):
+    vt = (view_type or "").lower()
+    if vt in ("mmv", "mm"):
+        return "mm"
+    elif vt in ("tv", "taker"):
+        return "taker"
+    elif vt in ("be_mm", "be-mm", "bem"):
+        return "be_mm"
+    elif vt in ("be_taker", "be-taker", "bet"):
+        return "be_taker"
+    return view_type
+
+
+class Chart(models.AbstractModel):
+    _name = "dankbit.chart"
+    _description = "Dankbit Chart Rendering"
+
+    # ---------- chart definitions ----------
+
+    @api.model
+    def _window_start(self, settings, minutes_ago=0):
+        """Start of a chart's trade window as a naive UTC datetime."""
+        if minutes_ago:
+            return datetime.now() - timedelta(minutes=minutes_ago)
+        if settings.last_hedging_time:
+            # stored as the config parameter's string
+            return fields.Datetime.to_datetime(settings.last_hedging_time)
+        midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0,
+                                                      tzinfo=None)
+        return midnight - timedelta(days=settings.from_days_ago)
+
+    @api.model
+    def _chart_spec(self, instrument, chart, settings, minutes_ago=0):
+        """Describe the chart served at /<instrument>/<chart>[/<minutes_ago>].
+
+        `chart` is one of the TAKER_CHARTS letters, a view type (day view)
+        or "<view type>/a" (all trades). Returns a dict with the trade
+        domain (and, for windowed charts, its filters without the window
+        and the window start), the plot view type, title, file name, refresh
+        interval, the sliding window length (minutes_ago, 0 for charts with
+        a fixed start) and the URLs of the chart's curve data and live events.
+        """
+        start = self._window_start(settings, minutes_ago)
+        window = [("deribit_ts", ">=", start)]
+        ago = f" from {minutes_ago} minutes ago" if minutes_ago else ""
+        urls = {
+            "data_url": self._chart_url(instrument, chart, minutes_ago, "data"),
+            "events_url": self._chart_url(instrument, chart, minutes_ago, "events"),
+        }
+
+        if chart in TAKER_CHARTS:
+            name, domain = TAKER_CHARTS[chart]
+            return {
+                "domain": domain + window + [("is_block_trade", "=", False)],
+                "filters": domain + [("is_block_trade", "=", False)],
+                "window_start": start,
+                "view_type": "taker",
+                "title": f"taker {name}{ago}",
+                "filename": f"{instrument}_{name}.png",
+                "refresh_interval": settings.refresh_interval,
+                "minutes_ago": minutes_ago,
+                **urls,
+            }
+        if chart.endswith("/a"):
+            view_type = chart[:-2]
+            return {
+                "domain": [("is_block_trade", "=", False)],
+                "filters": [("is_block_trade", "=", False)],
+                "window_start": None,
+                "view_type": _internal_view_type(view_type),
+                "title": f"{view_type} all",
+                "filename": f"{instrument}_{view_type}_all.png",
+                "refresh_interval": settings.refresh_interval * 5,
+                "minutes_ago": 0,
+                **urls,
+            }
+        return {
+            "domain": window + [("is_block_trade", "=", False)],
+            "filters": [("is_block_trade", "=", False)],
+            "window_start": start,
+            "view_type": _internal_view_type(chart),
+            "title": f"{chart}{ago or ' today'}",
+            "filename": f"{instrument}_{chart}_{minutes_ago}_minutes.png",
+            "refresh_interval": settings.refresh_interval,
+            "minutes_ago": minutes_ago,
+            **urls,
+        }
+
+    @api.model
+    def _chart_url(self, instrument, chart, minutes_ago=0, suffix=""):
+        """Path of a chart route, e.g. /ETH-18OCT26/mmv/data/60."""
+        path = f"/{instrument}/{chart}"
+        if suffix:
+            path += f"/{suffix}"
+        if minutes_ago:
+            path += f"/{minutes_ago}"
+        return path
+
+    @api.model
+    def _chart_key(self, instrument, chart, settings, minutes_ago=0, fmt="png", points=0):
+        """Everything a rendered chart depends on.
+
+        The database, the newest trade id of the instrument, the UTC day
+        (days to expiry) and the index price period; relative windows also
+        move every refresh_interval. Identical in every worker for the same
+        state. `fmt` and `points` tell the PNG and the curve data variants
+        apart.
+        """
+        Trade = self.env["dankbit.trade"].sudo()
+        now = time.time()
+        return (
+            self.env.cr.dbname, instrument, chart, minutes_ago, repr(settings),
+            Trade._get_trade_watermark(Trade._instrument_domain(instrument)),
+            datetime.now(timezone.utc).date().isoformat(),
+            int(now // INDEX_PRICE_TTL),
+            int(now // max(settings.refresh_interval, 1)) if minutes_ago else 0,
+            fmt, points,
+        )
+
+    @api.model
+    def _chart_key_expiry(self, settings, minutes_ago=0):
+        """Seconds until _chart_key changes even if no trades arrive."""
+        now = time.time()
+        periods = [INDEX_PRICE_TTL] + ([max(settings.refresh_interval, 1)] if minutes_ago else [])
+        return min(period - now % period for period in periods)
+
+    # ---------- rendering ----------
+
+    @api.model
+    def _fold_chart_trades(self, acc, filters, start, count, newest, settings, bucket_seconds=0):
+        """Reset `acc` (a CurveAccumulator or PrefixCurves) and add the trades
+        matching `filters` from `start` (naive UTC datetime, None for all) up
+        to trade id `newest`.
+
+        Whole minutes are read from dankbit.trade_rollup and only the partial
+        minute at `start` from dankbit.trade, both from a server-side cursor
+        in chunks of settings.stream_chunk_size rows, so memory does not grow
+        with the history. `count` is the number of these trades
+        (_get_trade_stats in this transaction); if the rollups do not add up
+        to it, or cannot reproduce settings.iv_bucket_width, all trades are
+        read from dankbit.trade instead.
+        """
+        Trade = self.env["dankbit.trade"].sudo()
+        Rollup = self.env["dankbit.trade_rollup"].sudo()
+        chunk_size = settings.stream_chunk_size
+        window = [("deribit_ts", ">=", start)] if start is not None else []
+        trade_sources = [(Trade, filters + window + [("id", "<=", newest)])]
+        use_rollups = Rollup._supports_iv_bucket_width(settings.iv_bucket_width)
+        sources = trade_sources
+        if use_rollups:
+            sources = []
+            rollup_domain = list(filters)
+            if start is not None:
+                minute = start.replace(second=0, microsecond=0)
+                if minute < start:
+                    minute += timedelta(minutes=1)
+                    sources.append((Trade, filters + [("deribit_ts", ">=", start),
+                                                      ("deribit_ts", "<", minute),
+                                                      ("id", "<=", newest)]))
+                rollup_domain.append(("minute", ">=", minute))
+            sources.append((Rollup, rollup_domain))
+
+        def fold(sources):
+            acc.reset(settings)
+            chunks = 0
+            for model, domain in sources:
+                for chunk in model._iter_trade_columns(domain, settings.iv_bucket_width,
+                                                       bucket_seconds, chunk_size):
+                    acc.add(chunk, settings)
+                    chunks += 1
+            return chunks
+
+        chunks = fold(sources)
+        if use_rollups and acc.trade_count != count:
+            _logger.warning("Trade rollups out of sync (%d trades, %d rolled up), reading trades",
+                            count, acc.trade_count)
+            chunks = fold(trade_sources)
+        acc.watermark = newest
+        _logger.info("Folded %d trades of %s in %d chunks (peak chunk %d rows)",
+                     acc.trade_count, acc.name, chunks, acc.peak_chunk)
+
+    @api.model
+    def _chart_accumulator(self, instrument, spec, settings):
+        """CurveAccumulator holding every trade of a chart with a fixed start.
+
+        Accumulators are shared per process (keyed on instrument, trade
+        domain, settings and UTC day) and only read and evaluate the trades
+        added since their watermark. New accumulators, and those whose trade
+        count does not add up (deletions, ids committed out of order), are
+        built from the per-minute rollups (see _fold_chart_trades).
+        """
+        Trade = self.env["dankbit.trade"].sudo()
+        filters = Trade._instrument_domain(instrument) + spec["filters"]
+        domain = Trade._instrument_domain(instrument) + spec["domain"]
+        key = (self.env.cr.dbname, instrument, repr(domain), repr(settings),
+               datetime.now(timezone.utc).date().isoformat())
+        acc = ACCUMULATORS.get(key, lambda: CurveAccumulator(instrument, settings))
+        with acc.lock:
+            count, newest = Trade._get_trade_stats(domain)
+            if newest < acc.watermark or (newest, count) == (acc.watermark, acc.trade_count):
+                # nothing new, or another request already went further
+                return acc
+            trades = None
+            if acc.watermark:
+                trades = Trade._read_trade_columns(
+                    domain + [("id", ">", acc.watermark), ("id", "<=", newest)],
+                    settings.iv_bucket_width,
+                )
+                if acc.trade_count + trades.trade_count != count:
+                    _logger.info("Rebuilding %s curves (%d trades)", instrument, count)
+                    trades = None
+            if trades is None:
+                self._fold_chart_trades(acc, filters, spec["window_start"], count, newest, settings)
+            else:
+                acc.add(trades, settings, newest)
+        return acc
+
+    @api.model
+    def _prefix_curves(self, instrument, spec, settings):
+        """PrefixCurves of the chart's filters, covering its window start.
+
+        Shared per process like _chart_accumulator, per instrument, filters,
+        settings and UTC day. The buckets reach back to the earliest window
+        start asked for (at most MAX_WINDOW_MINUTES), so flipping between 15,
+        30, 60 and 240 minutes reads and evaluates every trade only once.
+        Returns the PrefixCurves, its window() for the chart and the
+        watermark both were taken at.
+        """
+        Trade = self.env["dankbit.trade"].sudo()
+        filters = Trade._instrument_domain(instrument) + spec["filters"]
+        start = int(spec["window_start"].replace(tzinfo=timezone.utc).timestamp())
+        key = (self.env.cr.dbname, instrument, repr(filters), repr(settings),
+               datetime.now(timezone.utc).date().isoformat())
+        prefix = PREFIX_CURVES.get(key, lambda: PrefixCurves(instrument, settings, start))
+        with prefix.lock:
+            if start < prefix.origin:
+                prefix.reset(settings, start)
+            else:
+                prefix.trim(int(time.time()) - MAX_WINDOW_MINUTES * 60)
+
+            origin = datetime.fromtimestamp(prefix.origin, timezone.utc).replace(tzinfo=None)
+            domain = filters + [("deribit_ts", ">=", origin)]
+            count, newest = Trade._get_trade_stats(domain)
+            if not (newest < prefix.watermark or (newest, count) == (prefix.watermark, prefix.trade_count)):
+                trades = None
+                if prefix.watermark:
+                    trades = Trade._read_trade_columns(
+                        domain + [("id", ">", prefix.watermark), ("id", "<=", newest)],
+                        settings.iv_bucket_width, prefix.bucket_seconds,
+                    )
+                    if prefix.trade_count + trades.trade_count != count:
+                        _logger.info("Rebuilding %s prefix curves (%d trades)", instrument, count)
+                        trades = None
+                if trades is None:
+                    self._fold_chart_trades(prefix, filters, origin, count, newest, settings,
+                                            prefix.bucket_seconds)
+                else:
+                    prefix.add(trades, settings, newest)
+            return prefix, prefix.window(start), prefix.watermark
+
+    @api.model
+    def _window_curves(self, instrument, spec, settings, index_price):
+        """Curves of a minutes_ago window: two stored prefix rows apart plus
+        the trades of the partial minute at the window start."""
+        Trade = self.env["dankbit.trade"].sudo()
+        prefix, (boundary, payoffs, deltas, gammas, trade_count), watermark = \
+            self._prefix_curves(instrument, spec, settings)
+        edge = Trade._read_trade_columns(
+            Trade._instrument_domain(instrument) + spec["filters"] + [
+                ("deribit_ts", ">=", spec["window_start"]),
+                ("deribit_ts", "<", datetime.fromtimestamp(boundary, timezone.utc).replace(tzinfo=None)),
+                ("id", "<=", watermark),
+            ],
+            settings.iv_bucket_width,
+        )
+        if len(edge):
+            edge_payoffs, edge_deltas, edge_gammas = evaluate(edge, prefix.strat.STs, settings)
+            payoffs = payoffs + edge_payoffs
+            deltas = deltas + edge_deltas
+            gammas = gammas + edge_gammas
+            trade_count += edge.trade_count
+        return prefix.curves(index_price, spec["view_type"], spec["title"], settings,
+                             payoffs, deltas, gammas, trade_count)
+
+    @api.model
+    def _chart_curves(self, instrument, spec, settings):
+        """Compute the curves of a chart (render.ChartCurves) without drawing it."""
+        index_price = self.env["dankbit.trade"].sudo().get_index_price()
+        if not spec["minutes_ago"]:
+            acc = self._chart_accumulator(instrument, spec, settings)
+            with acc.lock:
+                return acc.curves(index_price, spec["view_type"], spec["title"], settings)
+        if spec["minutes_ago"] <= MAX_WINDOW_MINUTES:
+            return self._window_curves(instrument, spec, settings, index_price)
+
+        Trade = self.env["dankbit.trade"].sudo()
+        count, newest = Trade._get_trade_stats(Trade._instrument_domain(instrument) + spec["domain"])
+        acc = CurveAccumulator(instrument, settings)
+        self._fold_chart_trades(acc, Trade._instrument_domain(instrument) + spec["filters"],
+                                spec["window_start"], count, newest, settings)
+        return acc.curves(index_price, spec["view_type"], spec["title"], settings)
+
+    @api.model
+    def _render(self, instrument, spec, settings, fmt="png", points=0):
+        """Chart bytes: a PNG, an interactive "html" page, or the curve data
+        as "json" / packed "f32" / a "plotly" figure (see curve_data); only
+        the PNG touches matplotlib."""
+        curves = self._chart_curves(instrument, spec, settings)
+        if fmt == "png":
+            return render_pool.render_png(curves, settings.render_workers, settings.render_timeout)
+        if fmt == "html":
+            return self.env["ir.qweb"]._render("dankbit.chart_plotly", {
+                "title": f"{curves.name} {curves.title}",
+                "figure": Markup(curve_data.script_json(curve_data.to_plotly(curves, points))),
+                "plotly_src": curve_data.plotly_js_url(),
+                "events_url": spec["events_url"] + f"?format=plotly&points={points}",
+                "refresh_interval": spec["refresh_interval"],
+            }).encode()
+        return curve_data.encode(curves, fmt, points)
+
+    @api.model
+    def _get_chart(self, instrument, chart, settings, minutes_ago=0, key=None, fmt="png", points=0):
+        """Return the ChartEntry for a chart, rendering it only on a miss.
+
+        Looks in this worker's LRU cache, then in the shared snapshots
+        (dankbit.chart_snapshot); concurrent misses for the same chart are
+        rendered once per worker and once across workers.
+        """
+        key = key or self._chart_key(instrument, chart, settings, minutes_ago, fmt, points)
+        CHART_CACHE.resize(settings.chart_cache_mb * 1024 * 1024)
+        entry = CHART_CACHE.get(key)
+        if entry is not None:
+            return entry
+
+        etag = chart_etag(key)
+
+        def render():
+            spec = self._chart_spec(instrument, chart, settings, minutes_ago)
+            return self.env["dankbit.chart_snapshot"].sudo()._get_or_render(
+                etag, lambda: self._render(instrument, spec, settings, fmt, points))
+
+        return CHART_CACHE.put(key, CHART_FLIGHTS.do(etag, render))
+
+    # ---------- pre-rendering ----------
+
+    @api.model
+    def _parse_hot_charts(self, value):
+        """Parse "today/mmv, ETH-18OCT26/c/60, ..." into (instrument, chart, minutes_ago).
+
+        Entries use the chart URL paths; "today" stands for the instrument
+        alias of the nearest daily expiry.
+        """
+        today = None
+        charts = []
+        for path in (value or "").replace("\n", ",").split(","):
+            parts = [p for p in path.strip().strip("/").split("/") if p]
+            if len(parts) < 2:
+                continue
+            minutes_ago = 0
+            if len(parts) > 2 and parts[-1].isdigit():
+                minutes_ago = int(parts.pop())
+            instrument = parts[0]
+            if instrument.lower() == "today":
+                today = today or self.env["dankbit.trade"].get_eth_option_name_for_today()
+                instrument = today
+            charts.append((instrument, "/".join(parts[1:]), minutes_ago))
+        return charts
+
+    @api.model
+    def _prerender_hot_charts(self, changed_names=None):
+        """Render the configured hot charts (dankbit.hot_charts) ahead of viewers.
+
+        Called after ingestion; with `changed_names` only charts that
+        cover one of those instruments are rendered, and charts whose
+        snapshot is already current are left alone.
+        """
+        settings = DankbitSettings.get(self.env)
+        charts = self._parse_hot_charts(settings.hot_charts)
+        if not charts or changed_names is not None and not changed_names:
+            return
+
+        Trade = self.env["dankbit.trade"].sudo()
+        started = time.monotonic()
+        rendered = 0
+        for instrument, chart, minutes_ago in charts:
+            if changed_names is not None and not Trade.search_count(
+                Trade._instrument_domain(instrument) + [("name", "in", list(changed_names))],
+                limit=1,
+            ):
+                continue
+            try:
+                self._get_chart(instrument, chart, settings, minutes_ago)
+                rendered += 1
+            except Exception:
+                _logger.exception("Pre-rendering %s/%s failed", instrument, chart)
+        if rendered:
+            _logger.info("Pre-rendered %d hot charts in %.2fs", rendered, time.monotonic() - started)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import logging
+
+from psycopg2 import errors
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Snapshots only have to outlive the requests waiting for them.
+SNAPSHOT_MAX_AGE = "10 minutes"
+# How long a worker waits for another one rendering the same chart.
+SNAPSHOT_LOCK_TIMEOUT = "2s"
+
+
+class ChartSnapshot(models.Model):
+    _name = "dankbit.chart_snapshot"
+    _description = "Dankbit Rendered Chart"
+    _rec_name = "etag"
+
+    etag = fields.Char(required=True, index=True)
+    body = fields.Binary(attachment=False)
+
+    _sql_constraints = [
+        ("etag_uniqe", "unique (etag)", "There can only be one snapshot per chart!")
+    ]
+
+    @staticmethod
+    def _lock_id(etag):
+        # advisory locks take a signed bigint; 60 bits of the sha1 fit
+        return int(etag[:15], 16)
+
+    @staticmethod
+    def _fetch(cr, etag):
+        cr.execute("SELECT body FROM dankbit_chart_snapshot WHERE etag = %s", [etag])
+        row = cr.fetchone()
+        return base64.b64decode(bytes(row[0])) if row and row[0] is not None else None
+
+    @api.model
+    def _get_or_render(self, etag, render):
+        """Return the chart for `etag`, rendering it at most once across workers.
+
+        The first worker to take the Postgres advisory lock for the etag
+        renders and stores the result; workers arriving meanwhile wait at
+        most SNAPSHOT_LOCK_TIMEOUT for it and then read the stored snapshot,
+        or render locally if the leader is still busy. The lock and the
+        snapshot live on a second cursor so the snapshot is visible to the
+        others before the request ends; hits are served from the request's
+        own cursor without taking another connection.
+        """
+        body = self._fetch(self.env.cr, etag)
+        if body is not None:
+            return body
+
+        lock_id = self._lock_id(etag)
+        with self.env.registry.cursor() as cr:
+            # lock_timeout also bounds advisory lock waits, so a slow leader
+            # pins the followers' connections for a couple of seconds at most
+            cr.execute("SET LOCAL lock_timeout = %s", [SNAPSHOT_LOCK_TIMEOUT])
+            try:
+                # session lock: it outlives the commit below, which ends the
+                # transaction (and snapshot) that was open while waiting
+                cr.execute("SELECT pg_advisory_lock(%s)", [lock_id], log_exceptions=False)
+            except errors.LockNotAvailable:
+                cr.rollback()
+                locked = False
+            else:
+                cr.commit()
+                locked = True
+
+            if not locked:
+                body = self._fetch(cr, etag)
+                cr.rollback()
+                if body is not None:
+                    return body
+                _logger.debug("Chart %s is still being rendered elsewhere, rendering locally", etag)
+            else:
+                try:
+                    body = self._fetch(cr, etag)
+                    if body is not None:
+                        return body
+
+                    body = render()
+                    cr.execute(
+                        """
+                        INSERT INTO dankbit_chart_snapshot
+                            (etag, body, create_uid, create_date, write_uid, write_date)
+                        VALUES (%s, %s, %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC')
+                        ON CONFLICT (etag) DO NOTHING
+                        """,
+                        [etag, base64.b64encode(body), self.env.uid, self.env.uid],
+                    )
+                    cr.commit()
+                    return body
+                finally:
+                    cr.rollback()
+                    # session locks are released outside of any transaction
+                    cr.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+
+        return render()
+
+    @api.autovacuum
+    def _gc_snapshots(self):
+        """Delete snapshots older than SNAPSHOT_MAX_AGE.
+
+        Runs with the ingest cron (and Odoo's daily autovacuum) rather than
+        on every render.
+        """
+        self.env.cr.execute(
+            """
+            DELETE FROM dankbit_chart_snapshot
+             WHERE create_date < (NOW() AT TIME ZONE 'UTC') - %s::interval
+            """,
+            [SNAPSHOT_MAX_AGE],
+        )
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+# Deribit's credit based rate limit for non-matching-engine requests:
+# every call costs 500 credits, the bucket holds 50,000 and refills at
+# 10,000 credits per second (~20 sustained requests/s, bursts of 100).
+DERIBIT_MAX_CREDITS = 50000
+DERIBIT_REFILL_PER_SEC = 10000
+DERIBIT_REQUEST_COST = 500
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class DeribitClient:
+    """Shared HTTP client for the Deribit public API.
+
+    Keeps pooled keep-alive connections, spends requests from a token
+    bucket sized after Deribit's credit limits, stops calling the API for
+    BREAKER_COOLDOWN seconds after BREAKER_FAILURE_THRESHOLD consecutive
+    failures, and counts calls, errors and latency per endpoint.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, pool_size=32, max_credits=DERIBIT_MAX_CREDITS,
+                 refill_per_sec=DERIBIT_REFILL_PER_SEC):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.max_credits = max_credits
+        self.refill_per_sec = refill_per_sec
+        self._credits = float(max_credits)
+        self._refilled_at = time.monotonic()
+        self._bucket_lock = threading.Lock()
+
+        self._failures = 0
+        self._open_until = 0.0
+        self._breaker_lock = threading.Lock()
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    # ---------- rate budget ----------
+
+    def _acquire(self, cost):
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                self._credits = min(self.max_credits,
+                                    self._credits + (now - self._refilled_at) * self.refill_per_sec)
+                self._refilled_at = now
+                if self._credits >= cost:
+                    self._credits -= cost
+                    return
+                wait = (cost - self._credits) / self.refill_per_sec
+            time.sleep(wait)
+
+    def _drain(self):
+        with self._bucket_lock:
+            self._credits = 0.0
+            self._refilled_at = time.monotonic()
+
+    # ---------- circuit breaker ----------
+
+    def _allow(self):
+        with self._breaker_lock:
+            return time.monotonic() >= self._open_until
+
+    def _record(self, ok):
+        with self._breaker_lock:
+            if ok:
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._failures >= BREAKER_FAILURE_THRESHOLD:
+                self._open_until = time.monotonic() + BREAKER_COOLDOWN
+                # half-open: the next call after the cooldown is a probe
+                self._failures = BREAKER_FAILURE_THRESHOLD - 1
+                _logger.warning("Deribit circuit open for %.0fs after repeated failures",
+                                BREAKER_COOLDOWN)
+
+    # ---------- stats ----------
+
+    def _count(self, endpoint, latency, ok):
+        with self._stats_lock:
+            st = self._stats.setdefault(endpoint, {
+                "calls": 0, "errors": 0, "total_latency": 0.0, "max_latency": 0.0,
+            })
+            st["calls"] += 1
+            st["errors"] += 0 if ok else 1
+            st["total_latency"] += latency
+            st["max_latency"] = max(st["max_latency"], latency)
+
+    def stats(self):
+        with self._stats_lock:
+            return {endpoint: dict(st) for endpoint, st in self._stats.items()}
+
+    def format_stats(self):
+        return ", ".join(
+            "%s: %d calls, %d errors, avg %.0f ms, max %.0f ms" % (
+                endpoint, st["calls"], st["errors"],
+                1000 * st["total_latency"] / st["calls"], 1000 * st["max_latency"])
+            for endpoint, st in sorted(self.stats().items())
+        )
+
+    # ---------- requests ----------
+
+    def get(self, url, params, timeout=5.0, retries=2, backoff=0.5, cost=DERIBIT_REQUEST_COST):
+        """GET `url` and return the parsed JSON, or None on persistent failure."""
+        endpoint = url.rstrip("/").rsplit("/", 1)[-1]
+
+        for attempt in range(retries + 1):
+            if not self._allow():
+                _logger.debug("Deribit circuit open, skipping %s", endpoint)
+                return None
+
+            self._acquire(cost)
+            started = time.monotonic()
+            try:
+                resp = self.session.get(url, params=params, timeout=timeout)
+                if resp.status_code == 429:
+                    self._drain()
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                self._count(endpoint, time.monotonic() - started, False)
+                self._record(False)
+                _logger.warning("Deribit request failed (attempt %d/%d) %s %s: %s",
+                                attempt + 1, retries + 1, url, params, e)
+                if attempt < retries:
+                    time.sleep(backoff * (2 ** attempt))
+                continue
+
+            self._count(endpoint, time.monotonic() - started, True)
+            self._record(True)
+            return data
+        return None
+
+
+_CLIENT = None
+_CLIENT_PID = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide DeribitClient (re-created after a fork)."""
+    global _CLIENT, _CLIENT_PID
+    pid = os.getpid()
+    if _CLIENT is None or _CLIENT_PID != pid:
+        with _CLIENT_LOCK:
+            if _CLIENT is None or _CLIENT_PID != pid:
+                _CLIENT = DeribitClient()
+                _CLIENT_PID = pid
+    return _CLIENT
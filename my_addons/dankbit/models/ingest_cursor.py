@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class IngestCursor(models.Model):
+    _name = "dankbit.ingest_cursor"
+    _description = "Dankbit Ingestion Cursor"
+    _rec_name = "key"
+
+    # instrument name (ETH-29NOV24-2200-C) or "currency:ETH"
+    key = fields.Char(required=True, index=True)
+    last_ts = fields.Float(string="Last Timestamp (ms)", digits=(15, 0))
+    last_trade_seq = fields.Float(digits=(15, 0))
+
+    _sql_constraints = [
+        ("key_uniqe", "unique (key)", "There can only be one cursor per key!")
+    ]
+
+    @api.model
+    def _get_positions(self, keys):
+        """Return {key: last_ts} for the given keys in one query."""
+        if not keys:
+            return {}
+        self.env.cr.execute(
+            "SELECT key, last_ts FROM dankbit_ingest_cursor WHERE key = ANY(%s)",
+            [list(keys)],
+        )
+        return {key: int(last_ts or 0) for key, last_ts in self.env.cr.fetchall()}
+
+    @api.model
+    def _advance(self, key, last_ts, last_trade_seq=None):
+        """Move a cursor forward, never backwards.
+
+        The trade sequence is only taken from a write that does not move
+        last_ts back, so it always belongs to the stored timestamp.
+
+        Runs in the caller's transaction so it commits together with the
+        trades it covers.
+        """
+        uid = self.env.uid
+        self.env.cr.execute(
+            """
+            INSERT INTO dankbit_ingest_cursor
+                (key, last_ts, last_trade_seq, create_uid, create_date, write_uid, write_date)
+            VALUES (%s, %s, %s, %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC')
+            ON CONFLICT (key) DO UPDATE
+               SET last_ts = GREATEST(dankbit_ingest_cursor.last_ts, EXCLUDED.last_ts),
+                   last_trade_seq = CASE
+                       WHEN EXCLUDED.last_ts >= dankbit_ingest_cursor.last_ts
+                       THEN COALESCE(EXCLUDED.last_trade_seq, dankbit_ingest_cursor.last_trade_seq)
+                       ELSE dankbit_ingest_cursor.last_trade_seq
+                   END,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            """,
+            [key, last_ts, last_trade_seq, uid, uid],
+        )
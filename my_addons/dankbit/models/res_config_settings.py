@@ -39,6 +39,53 @@ class ResConfigSettings(models.TransientModel):
         help="If 0 (default) the gamma plotting magnification is computed automatically."
     )
 
+    iv_bucket_width = fields.Float(
+        string="IV bucket width (0 = per trade)",
+        config_parameter="dankbit.iv_bucket_width",
+        default=1.0,
+        help="Trades with the same strike, expiry, type and direction whose IV falls in the "
+             "same bucket of this many IV points are evaluated as one position, at the middle "
+             "IV of the bucket. Multiples of 0.5 let charts read the per-minute trade rollups."
+    )
+
+    chart_cache_mb = fields.Integer(
+        string="Chart cache size (MB)",
+        config_parameter="dankbit.chart_cache_mb",
+        default=64,
+        help="Memory budget per worker for rendered charts. Unchanged charts are served "
+             "from this cache, or answered with 304 Not Modified."
+    )
+
+    hot_charts = fields.Char(
+        string="Pre-rendered charts",
+        config_parameter="dankbit.hot_charts",
+        help="Comma separated chart paths rendered right after new trades are ingested, "
+             "e.g. today/mmv, today/tv/60, ETH-18OCT26/c. \"today\" is the nearest daily expiry."
+    )
+
+    render_workers = fields.Integer(
+        string="Chart render processes",
+        config_parameter="dankbit.render_workers",
+        default=2,
+        help="Processes per Odoo worker that draw charts with matplotlib. "
+             "0 renders inside the Odoo worker."
+    )
+
+    render_timeout = fields.Float(
+        string="Chart render timeout (s)",
+        config_parameter="dankbit.render_timeout",
+        default=30.0,
+        help="How long to wait for a render process before drawing the chart in-process."
+    )
+
+    stream_chunk_size = fields.Integer(
+        string="Chart read chunk size",
+        config_parameter="dankbit.stream_chunk_size",
+        default=5000,
+        help="Rows fetched at a time when charts (re)build their curves from the stored "
+             "trades; bounds the memory used by the all-trades view."
+    )
+
     deribit_timeout = fields.Float(
         string="Deribit API timeout (s)",
         config_parameter="dankbit.deribit_timeout",
@@ -51,8 +98,40 @@ class ResConfigSettings(models.TransientModel):
         help="Time-to-live in seconds for cached Deribit responses (index/instruments)."
     )
 
+    deribit_api_url = fields.Char(
+        string="Deribit API URL",
+        config_parameter="dankbit.deribit_api_url",
+        help="Base URL of the Deribit REST API (default https://www.deribit.com/api/v2)."
+    )
+
+    deribit_ws_url = fields.Char(
+        string="Deribit WebSocket URL",
+        config_parameter="dankbit.deribit_ws_url",
+        help="WebSocket endpoint used by the streaming ingestion (default wss://www.deribit.com/ws/api/v2)."
+    )
+
+    ingest_mode = fields.Selection(
+        [("instrument", "Per instrument"), ("currency", "Currency-wide cursor")],
+        string="Trade ingestion mode",
+        config_parameter="dankbit.ingest_mode",
+        default="instrument",
+        help="Per instrument polls every live ETH option; currency-wide pages through "
+             "all ETH option trades with a single cursor."
+    )
+
+    fetch_concurrency = fields.Integer(
+        string="Deribit fetch concurrency",
+        config_parameter="dankbit.fetch_concurrency",
+        default=8,
+        help="Number of instruments fetched in parallel by the trade cron (1 = sequential)."
+    )
+
     mock_0dte = fields.Boolean(
         string="Mock 0DTE",
         config_parameter="dankbit.mock_0dte"
     )
-    
\ No newline at end of file
+
+    def set_values(self):
+        super().set_values()
+        # drop cached DankbitSettings snapshots in every worker
+        self.env.registry.clear_cache()
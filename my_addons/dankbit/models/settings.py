@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import typing
+from dataclasses import dataclass, fields as dc_fields
+
+from odoo import api, models, tools
+
+# -----------------------------
+# ETH defaults (Option A)
+# -----------------------------
+ETH_DEFAULT_FROM = 1000.0
+ETH_DEFAULT_TO = 6000.0
+ETH_DEFAULT_STEPS = 10
+
+
+def _to_float(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_int(value, default):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _value_type(annotation):
+    """The type of a field annotated `T` or `T | None`."""
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    return args[0] if len(args) == 1 else annotation
+
+
+@dataclass(frozen=True)
+class DankbitSettings:
+    """Typed, immutable snapshot of all dankbit.* config parameters.
+
+    Load it once per request or cron run with DankbitSettings.get(env) and
+    pass it down instead of reading ir.config_parameter in loops.
+    """
+    from_price: float = ETH_DEFAULT_FROM
+    to_price: float = ETH_DEFAULT_TO
+    steps: int = ETH_DEFAULT_STEPS
+    refresh_interval: int = 60
+    from_days_ago: int = 1
+    last_hedging_time: str | None = None
+    gamma_plot_scale: float = 0.0
+    greeks_min_time_hours: float = 1.0
+    iv_bucket_width: float = 1.0
+    chart_cache_mb: int = 64
+    hot_charts: str | None = None
+    render_workers: int = 2
+    render_timeout: float = 30.0
+    stream_chunk_size: int = 5000
+    mock_0dte: bool = False
+    deribit_timeout: float = 5.0
+    deribit_cache_ttl: float | None = None   # None: per-endpoint default
+    deribit_api_url: str | None = None
+    deribit_ws_url: str | None = None
+    ingest_mode: str = "instrument"
+    fetch_concurrency: int = 8
+
+    @classmethod
+    def from_params(cls, params):
+        """Build a snapshot from a {key: value} dict of config parameters."""
+        defaults = cls()
+        values = {}
+        for field in dc_fields(cls):
+            raw = params.get(f"dankbit.{field.name}")
+            default = getattr(defaults, field.name)
+            field_type = _value_type(field.type)
+            if raw in (None, False, ""):
+                values[field.name] = default
+            elif field_type is float:
+                values[field.name] = _to_float(raw, default)
+            elif field_type is int:
+                values[field.name] = _to_int(raw, default)
+            elif field_type is bool:
+                values[field.name] = str(raw).lower() in ("true", "1")
+            else:
+                values[field.name] = raw
+        return cls(**values)
+
+    @classmethod
+    def get(cls, env):
+        return env['ir.config_parameter'].sudo()._get_dankbit_settings()
+
+
+class IrConfigParameter(models.Model):
+    _inherit = "ir.config_parameter"
+
+    @api.model
+    @tools.ormcache()
+    def _get_dankbit_settings(self):
+        # ir.config_parameter writes clear the registry cache, so the
+        # snapshot is rebuilt after any parameter (or settings) change.
+        self.env.cr.execute(
+            "SELECT key, value FROM ir_config_parameter WHERE key LIKE %s", ["dankbit.%"]
+        )
+        return DankbitSettings.from_params(dict(self.env.cr.fetchall()))
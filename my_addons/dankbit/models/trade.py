@@ -2,10 +2,20 @@
 
 import pytz
 from datetime import datetime, timezone, timedelta
+import itertools
 import logging
-import requests, time
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from odoo import api, fields, models
+from odoo.service.model import retrying
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+from .deribit_client import get_client
+from .settings import DankbitSettings
+from ..lib import chart_events
+from ..lib.greeks import TradeColumns
 
 _logger = logging.getLogger(__name__)
 
@@ -16,29 +26,149 @@ _DERIBIT_CACHE = {
     'instruments': {'ts': 0, 'value': None},
 }
 
+DERIBIT_API_URL = "https://www.deribit.com/api/v2"
+
+
+def _parse_instrument_name(instrument_name):
+    """Split a Deribit instrument or expiry name into (underlying, expiry date).
+    ETH-29NOV24-2200-C and ETH-29NOV24 both give ("ETH", date(2024, 11, 29)).
+    Returns (False, False) when the name does not follow that format.
+    """
+    parts = str(instrument_name or "").upper().split("-")
+    if len(parts) < 2 or not parts[0]:
+        return False, False
+    try:
+        expiry = datetime.strptime(parts[1], "%d%b%y").date()
+    except ValueError:
+        return False, False
+    return parts[0], expiry
+
+
+def _expiration_ts_from_name(instrument_name):
+    """Expiry (epoch ms) encoded in a Deribit option name, or None.
+    Deribit options expire at 08:00 UTC: ETH-29NOV24-2200-C -> 2024-11-29 08:00.
+    """
+    expiry = _parse_instrument_name(instrument_name)[1]
+    if not expiry:
+        return None
+    expiry = datetime(expiry.year, expiry.month, expiry.day, 8, tzinfo=timezone.utc)
+    return int(expiry.timestamp() * 1000)
+
+
 def _safe_deribit_request(url, params, timeout=5.0, retries=2, backoff=0.5):
-    """Make a requests.get call with retries and exponential backoff.
+    """GET a Deribit endpoint through the shared pooled, rate-budgeted client.
     Returns parsed JSON on success, or None on persistent failure.
     """
-    for attempt in range(retries + 1):
-        try:
-            resp = requests.get(url, params=params, timeout=timeout)
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            _logger.warning("Deribit request failed (attempt %d/%d) %s %s: %s",
-                            attempt + 1, retries + 1, url, params, e)
-            if attempt < retries:
-                time.sleep(backoff * (2 ** attempt))
-            else:
-                return None
+    return get_client().get(url, params, timeout=timeout, retries=retries, backoff=backoff)
+
+
+def _fetch_instrument_trades(url, inst_name, start_ts, end_ts, timeout=5.0):
+    """Page through Deribit trades for one instrument.
+    Only talks HTTP (no ORM access), so it is safe to run from worker threads.
+    Returns (trades, complete): the raw trade dicts in ascending timestamp
+    order, and whether the whole range up to end_ts was covered.
+    """
+    trades = []
+    complete = False
+    while True:
+        params = {
+            "instrument_name": inst_name,
+            "count": 1000,
+            "start_timestamp": start_ts,
+            "end_timestamp": end_ts,
+            "sorting": "asc",
+        }
+        data = _safe_deribit_request(url, params=params, timeout=timeout)
+        if not data or "result" not in data:
+            _logger.warning("No result for %s (params=%s)", inst_name, params)
+            break
+
+        page = data["result"].get("trades", [])
+        if not page:
+            complete = True
+            break
+
+        trades.extend(page)
+        start_ts = page[-1]["timestamp"] + 1
+
+        if not data["result"].get("has_more"):
+            complete = True
+            break
+    return trades, complete
+
+
+def _stream_trade_columns(cr, rows, chunk_size):
+    """Run the `rows` query (see _fetch_trade_columns) through a server-side
+    cursor and yield TradeColumns of at most `chunk_size` rows each."""
+    query = SQL(
+        """
+        SELECT strike, days, iv, amount, sign, is_call, premium, count, bucket
+          FROM (%s) AS trade_rows
+        """,
+        rows,
+    )
+    chunk_size = max(int(chunk_size), 1)
+    with cr._cnx.cursor(name=f"dankbit_trade_rows_{next(_STREAM_IDS)}") as named:
+        named.itersize = chunk_size
+        named.execute(query.code, query.params)
+        while chunk := named.fetchmany(chunk_size):
+            yield TradeColumns(*zip(*chunk))
+
+
+def _fetch_trade_columns(cr, rows):
+    """Run the `rows` query (strike, days, is_call, sign, bucket, iv, amount,
+    premium and count columns) and return its rows as TradeColumns."""
+    cr.execute(SQL(
+        """
+        SELECT array_agg(strike), array_agg(days), array_agg(iv), array_agg(amount),
+               array_agg(sign), array_agg(is_call), array_agg(premium), array_agg(count),
+               array_agg(bucket)
+          FROM (%s) AS trade_rows
+        """,
+        rows,
+    ))
+    row = cr.fetchone()
+    if not row or row[0] is None:
+        return TradeColumns()
+    return TradeColumns(*row)
+
+
+def _group_iv_buckets(rows, iv_bucket_width):
+    """Sum the `rows` query (chart columns plus `iv_bucket`, the IV bucket
+    number) per strike, expiry, type, direction, time bucket and IV bucket.
+
+    Each group is evaluated at the middle IV of its bucket, so every trade
+    adds the same amount to the curves whichever query or batch it is read
+    in; grouping is an approximation of the per-trade IVs, not of the sums.
+    """
+    return SQL(
+        """
+        SELECT strike, days, is_call, sign, bucket, (iv_bucket + 0.5) * %(width)s AS iv,
+               SUM(amount) AS amount, SUM(premium) AS premium, SUM(count) AS count
+          FROM (%(rows)s) AS bucket_rows
+         GROUP BY strike, days, is_call, sign, bucket, iv_bucket
+        """,
+        rows=rows,
+        width=float(iv_bucket_width),
+    )
+
+
+# Names of the server-side cursors opened by _stream_trade_columns.
+_STREAM_IDS = itertools.count()
+
+# Fields summed into dankbit.trade_rollup; writing them rebuilds the rollups.
+_ROLLUP_FIELDS = {"name", "deribit_ts", "direction", "is_block_trade", "iv", "amount", "price",
+                  "index_price", "expiration"}
+
 
 class Trade(models.Model):
     _name = "dankbit.trade"
     _order = "deribit_ts desc"
 
-    name = fields.Char(required=True)
-    strike = fields.Integer(compute="_compute_strike", store=True)
+    name = fields.Char(required=True, index=True)
+    underlying = fields.Char(compute="_compute_instrument_parts", store=True, index=True)
+    expiry_date = fields.Date(compute="_compute_instrument_parts", store=True, index=True)
+    strike = fields.Integer(compute="_compute_strike", store=True, index=True)
     expiration = fields.Datetime()
     index_price = fields.Float(digits=(16, 4))
     price = fields.Float(digits=(16, 4), required=True)
@@ -82,6 +212,19 @@ class Trade(models.Model):
          "The Deribit trade ID must be unique!")
     ]
 
+    def init(self):
+        # chart windows: one expiry, non-block trades, deribit_ts range
+        create_index(self.env.cr, "dankbit_trade_expiry_block_ts_index", self._table,
+                     ["expiry_date", "is_block_trade", "deribit_ts"])
+        # ingestion resume: newest trade of one instrument
+        create_index(self.env.cr, "dankbit_trade_name_ts_index", self._table,
+                     ["name", "deribit_ts"])
+
+    @api.depends("name")
+    def _compute_instrument_parts(self):
+        for rec in self:
+            rec.underlying, rec.expiry_date = _parse_instrument_name(rec.name)
+
     @api.depends("name")
     def _compute_type(self):
         for rec in self:
@@ -106,16 +249,12 @@ class Trade(models.Model):
 
     def get_index_price(self):
         _logger.info("------------------- get_index_price -------------------")
-        URL = "https://www.deribit.com/api/v2/public/get_index_price"
+        URL = self._deribit_api_url("public/get_index_price")
         params = {"index_name": "eth_usdt"}   # ← ETH only
 
-        timeout = 5.0
-        try:
-            icp = self.env['ir.config_parameter'].sudo()
-            timeout = float(icp.get_param('dankbit.deribit_timeout', default=5.0))
-            cache_ttl = float(icp.get_param('dankbit.deribit_cache_ttl', default=30.0))
-        except Exception:
-            cache_ttl = 30.0
+        settings = DankbitSettings.get(self.env)
+        timeout = settings.deribit_timeout
+        cache_ttl = settings.deribit_cache_ttl if settings.deribit_cache_ttl is not None else 30.0
 
         now_ts = time.time()
         cached = _DERIBIT_CACHE.get('index_price', {})
@@ -134,83 +273,300 @@ class Trade(models.Model):
             _logger.exception("get_index_price failed and no cache available")
             return 0.0
 
+    def _deribit_api_url(self, method):
+        base = DankbitSettings.get(self.env).deribit_api_url or DERIBIT_API_URL
+        return f"{base.rstrip('/')}/{method}"
+
+    @api.model
+    def _get_trade_watermark(self, domain=None):
+        """Id of the newest stored trade matching `domain`; changes whenever
+        such trades are ingested."""
+        query = self._search(domain or [])
+        query.order = None
+        self.env.cr.execute(query.select(SQL("MAX(%s.id)", SQL.identifier(self._table))))
+        return self.env.cr.fetchone()[0] or 0
+
+    @api.model
+    def _get_trade_stats(self, domain=None):
+        """(number of trades, newest trade id) matching `domain`, in one query."""
+        query = self._search(domain or [])
+        query.order = None
+        t = SQL.identifier(self._table)
+        self.env.cr.execute(query.select(SQL("COUNT(*), MAX(%s.id)", t)))
+        count, newest = self.env.cr.fetchone()
+        return count, newest or 0
+
     def _get_latest_trade_ts(self):
         return self.search([], order="deribit_ts desc", limit=1)
 
     def _get_latest_trade_ts_for_instrument(self, instrument_name: str):
         return self.search([("name", "=", instrument_name)], order="deribit_ts desc", limit=1)
 
+    def _get_latest_trade_ms_for_instrument(self, instrument_name: str):
+        latest_trade = self._get_latest_trade_ts_for_instrument(instrument_name)
+        if not latest_trade or not latest_trade.deribit_ts:
+            return 0
+        dt_val = latest_trade.deribit_ts
+        if isinstance(dt_val, str):
+            dt_obj = fields.Datetime.from_string(dt_val)
+        else:
+            dt_obj = dt_val
+        if dt_obj.tzinfo is None:
+            dt_obj = dt_obj.replace(tzinfo=timezone.utc)
+        return int(dt_obj.timestamp() * 1000)
+
+    @api.model
+    def _instrument_domain(self, instrument):
+        """Domain matching the trades of a chart instrument.
+
+        Expiry aliases (ETH-18OCT26) and full option names use the stored,
+        indexed underlying/expiry_date/name columns; anything else falls
+        back to a substring match on the name.
+        """
+        underlying, expiry_date = _parse_instrument_name(instrument)
+        if not expiry_date:
+            return [("name", "ilike", f"{instrument}")]
+        parts = str(instrument).upper().split("-")
+        if len(parts) >= 4:
+            return [("name", "=", "-".join(parts))]
+        domain = [("underlying", "=", underlying), ("expiry_date", "=", expiry_date)]
+        if len(parts) == 3 and parts[2].isdigit():
+            domain.append(("strike", "=", int(parts[2])))
+        return domain
+
+    @api.model
+    def _read_trade_columns(self, domain, iv_bucket_width=0.0, bucket_seconds=0):
+        """Load the chart columns of all trades matching `domain`.
+
+        Runs one column-projected, aggregated query and hands the arrays to
+        NumPy directly; no recordset is built. See _trade_rows for the
+        arguments.
+        """
+        return _fetch_trade_columns(self.env.cr, self._trade_rows(domain, iv_bucket_width,
+                                                                  bucket_seconds))
+
+    @api.model
+    def _iter_trade_columns(self, domain, iv_bucket_width=0.0, bucket_seconds=0, chunk_size=5000):
+        """_read_trade_columns in TradeColumns chunks of at most `chunk_size`
+        rows, streamed from a server-side cursor."""
+        return _stream_trade_columns(self.env.cr, self._trade_rows(domain, iv_bucket_width,
+                                                                   bucket_seconds), chunk_size)
+
+    @api.model
+    def _trade_rows(self, domain, iv_bucket_width=0.0, bucket_seconds=0):
+        """Query with the chart columns of the trades matching `domain`;
+        days_to_expiry is computed in SQL (UTC dates, like
+        _compute_days_to_expiry).
+
+        With a positive `iv_bucket_width` (IV points) trades sharing strike,
+        expiry, type, direction and IV bucket are summed in SQL first (see
+        _group_iv_buckets): amount and premium are summed, IV is the middle
+        of the bucket and `count` keeps the number of trades per group.
+
+        With a positive `bucket_seconds` every row also gets the number of
+        the deribit_ts time bucket it falls in (seconds since the epoch //
+        bucket_seconds); aggregated rows never span two buckets.
+        """
+        query = self._search(domain)
+        query.order = None  # the rows are aggregated, never listed
+        t = SQL.identifier(self._table)
+        # iv, amount and prices are numeric columns: cast them so they reach
+        # NumPy as floats rather than Decimal objects
+        columns = SQL(
+            """
+            %(t)s.strike AS strike,
+            COALESCE(%(t)s.expiration::date - (NOW() AT TIME ZONE 'UTC')::date, 0) AS days,
+            %(t)s.option_type = 'call' AS is_call,
+            CASE WHEN %(t)s.direction = 'sell' THEN -1 ELSE 1 END AS sign,
+            %(bucket)s AS bucket,
+            %(t)s.amount::float8 AS amount,
+            %(t)s.price::float8 * %(t)s.index_price::float8 AS premium,
+            1 AS count
+            """,
+            t=t,
+            bucket=SQL("FLOOR(EXTRACT(EPOCH FROM %s.deribit_ts) / %s)::bigint", t, int(bucket_seconds))
+            if bucket_seconds and bucket_seconds > 0 else SQL("0"),
+        )
+        if iv_bucket_width and iv_bucket_width > 0:
+            # bucket numbers in exact numeric arithmetic, like the rollups'
+            return _group_iv_buckets(query.select(columns, SQL(
+                "FLOOR(%s.iv / %s::numeric)::float8 AS iv_bucket", t, float(iv_bucket_width),
+            )), iv_bucket_width)
+        return query.select(columns, SQL("%s.iv::float8 AS iv", t))
+
     # ========== FETCHING & INGESTION ==========
 
     def get_last_trades(self):
+        settings = DankbitSettings.get(self.env)
+        self.env["dankbit.chart_snapshot"].sudo()._gc_snapshots()
+        if settings.ingest_mode == "currency":
+            changed = self._get_last_trades_by_currency()
+            self.env["dankbit.chart"]._prerender_hot_charts(changed)
+            return
+
         option_instruments = [
             inst for inst in self._get_instruments() if inst.get("kind") == "option"
         ]
-        icp = self.env['ir.config_parameter'].sudo()
-        try:
-            timeout = float(icp.get_param('dankbit.deribit_timeout', default=5.0))
-        except Exception:
-            timeout = 5.0
-        try:
-            start_from_days = int(icp.get_param("dankbit.from_days_ago", default=1))
-        except Exception:
-            start_from_days = 1
+        timeout = settings.deribit_timeout
+        concurrency = settings.fetch_concurrency
 
         now_ts = int(time.time() * 1000)
-        base_start = self._get_midnight_dt(start_from_days)
+        base_start = self._get_midnight_dt(settings.from_days_ago)
+
+        URL = self._deribit_api_url("public/get_last_trades_by_instrument_and_time")
 
-        URL = "https://www.deribit.com/api/v2/public/get_last_trades_by_instrument_and_time"
+        # Resume points are resolved up-front in the cron cursor; only the
+        # HTTP paging runs concurrently.
+        names = [inst["instrument_name"] for inst in option_instruments if inst.get("instrument_name")]
+        positions = self.env["dankbit.ingest_cursor"].sudo()._get_positions(names)
 
+        jobs = []
         for inst in option_instruments:
             inst_name = inst.get("instrument_name")
             if not inst_name:
                 continue
 
-            latest_trade = self._get_latest_trade_ts_for_instrument(inst_name)
-
-            if latest_trade and latest_trade.deribit_ts:
-                dt_val = latest_trade.deribit_ts
-                if isinstance(dt_val, str):
-                    dt_obj = fields.Datetime.from_string(dt_val)
-                else:
-                    dt_obj = dt_val
-                if dt_obj.tzinfo is None:
-                    dt_obj = dt_obj.replace(tzinfo=timezone.utc)
-                start_ts = int(dt_obj.timestamp() * 1000)
-            else:
-                start_ts = base_start
+            start_ts = positions.get(inst_name)
+            if not start_ts:
+                # No cursor yet (first run or new listing): fall back to the
+                # newest stored trade once, the cursor takes over afterwards.
+                start_ts = self._get_latest_trade_ms_for_instrument(inst_name) or base_start
+            start_ts = max(start_ts, base_start)
 
             _logger.info("Fetching trades for %s from %s → %s",
                          inst_name, start_ts, now_ts)
+            jobs.append((inst, start_ts))
+
+        cursors = self.env["dankbit.ingest_cursor"].sudo()
+        min_ts = self._get_ingest_min_ts()
+        changed = set()
+        for inst, trades, complete in self._iter_fetched_trades(URL, jobs, now_ts, timeout, concurrency):
+            def ingest():
+                for i in range(0, len(trades), 1000):
+                    if self._create_trades_batch(trades[i:i + 1000], inst.get("expiration_timestamp"), min_ts):
+                        changed.add(inst["instrument_name"])
+
+                if trades or complete:
+                    last = trades[-1] if trades else {}
+                    cursors._advance(
+                        inst["instrument_name"],
+                        now_ts if complete else last["timestamp"],
+                        last.get("trade_seq"),
+                    )
+
+            # rolls back and retries on serialization failures, then commits
+            retrying(ingest, self.env)
+
+        _logger.info("Deribit client: %s", get_client().format_stats())
+        self.env["dankbit.chart"]._prerender_hot_charts(changed)
+
+    def _get_last_trades_by_currency(self):
+        """Ingest ETH option trades from Deribit's currency-wide trade stream.
+
+        A single dankbit.ingest_cursor row ("currency:ETH") replaces the
+        per-instrument resume queries, and expiries come from the cached
+        instrument list (or the instrument name, for instruments missing from
+        it). Returns the names of instruments that got new trades.
+        """
+        settings = DankbitSettings.get(self.env)
+        timeout = settings.deribit_timeout
+
+        expirations = {
+            inst["instrument_name"]: inst.get("expiration_timestamp")
+            for inst in self._get_instruments()
+            if inst.get("kind") == "option" and inst.get("instrument_name")
+        }
 
-            while True:
-                params = {
-                    "instrument_name": inst_name,
-                    "count": 1000,
-                    "start_timestamp": start_ts,
-                    "end_timestamp": now_ts,
-                    "sorting": "asc",
-                }
-                data = _safe_deribit_request(URL, params=params, timeout=timeout)
-                if not data or "result" not in data:
-                    _logger.warning("No result for %s (params=%s)", inst_name, params)
-                    break
-
-                trades = data["result"].get("trades", [])
-                if not trades:
-                    break
-
-                for trd in trades:
-                    self._create_new_trade(trd, inst.get("expiration_timestamp"))
-
-                start_ts = trades[-1]["timestamp"] + 1
-
-                if not data["result"].get("has_more"):
-                    break
+        cursors = self.env["dankbit.ingest_cursor"].sudo()
+        cursor_key = "currency:ETH"
+        now_ts = int(time.time() * 1000)
+        start_ts = cursors._get_positions([cursor_key]).get(cursor_key, 0)
+        start_ts = max(start_ts, self._get_midnight_dt(settings.from_days_ago))
+        min_ts = self._get_ingest_min_ts()
+
+        URL = self._deribit_api_url("public/get_last_trades_by_currency_and_time")
+        ID_URL = self._deribit_api_url("public/get_last_trades_by_currency")
+        _logger.info("Fetching ETH option trades from %s → %s", start_ts, now_ts)
+        changed = set()
+        start_id = None
+
+        while True:
+            params = {
+                "currency": "ETH",
+                "kind": "option",
+                "count": 1000,
+                "sorting": "asc",
+            }
+            if start_id is None:
+                url = URL
+                params.update(start_timestamp=start_ts, end_timestamp=now_ts)
+            else:
+                url = ID_URL
+                params["start_id"] = start_id
+            data = _safe_deribit_request(url, params=params, timeout=timeout)
+            if not data or "result" not in data:
+                _logger.warning("No result for ETH options (params=%s)", params)
+                break
+
+            trades = data["result"].get("trades", [])
+            if not trades:
+                break
+
+            for trd in trades:
+                name = trd.get("instrument_name")
+                if not expirations.get(name):
+                    expirations[name] = _expiration_ts_from_name(name)
+            # Restart on the last timestamp itself: trades sharing that
+            # millisecond may straddle the page boundary, duplicates are
+            # dropped by the insert. A page that does not get past start_ts
+            # (a full page within one millisecond) would come back unchanged,
+            # so the next one starts from its last trade ID instead.
+            last_ts = trades[-1]["timestamp"]
+            start_id = trades[-1].get("trade_id") if last_ts <= start_ts else None
+            start_ts = max(start_ts, last_ts)
+
+            def ingest():
+                new_trades = self._create_trades_batch(trades, None, min_ts, expirations=expirations)
+                changed.update(name for name in new_trades.values() if name)
+                cursors._advance(cursor_key, start_ts, trades[-1].get("trade_seq"))
+
+            # rolls back and retries on serialization failures, then commits
+            retrying(ingest, self.env)
+
+            if not data["result"].get("has_more"):
+                break
+        return changed
 
-                time.sleep(0.05)
+    @staticmethod
+    def _iter_fetched_trades(url, jobs, end_ts, timeout, concurrency):
+        """Yield (instrument, trades, complete) as soon as each fetch finishes.
+
+        With concurrency <= 1 instruments are fetched one after another,
+        otherwise up to `concurrency` instruments are paged in parallel.
+        Results are consumed by the calling thread, which owns the cursor.
+        """
+        if concurrency <= 1 or len(jobs) <= 1:
+            for inst, start_ts in jobs:
+                yield (inst,) + _fetch_instrument_trades(
+                    url, inst["instrument_name"], start_ts, end_ts, timeout)
+            return
 
-            self.env.cr.commit()
+        with ThreadPoolExecutor(max_workers=concurrency,
+                                thread_name_prefix="dankbit_fetch") as pool:
+            futures = {
+                pool.submit(_fetch_instrument_trades, url, inst["instrument_name"],
+                            start_ts, end_ts, timeout): inst
+                for inst, start_ts in jobs
+            }
+            for future in as_completed(futures):
+                inst = futures[future]
+                try:
+                    trades, complete = future.result()
+                except Exception:
+                    _logger.exception("Fetching trades for %s failed",
+                                      inst.get("instrument_name"))
+                    continue
+                yield inst, trades, complete
 
     def _get_tomorrows_ts(self):
         now = datetime.now(pytz.utc)
@@ -219,20 +575,16 @@ class Trade(models.Model):
         return int(target.timestamp() * 1000)
 
     def _get_instruments(self):
-        URL = "https://www.deribit.com/api/v2/public/get_instruments"
+        URL = self._deribit_api_url("public/get_instruments")
         params = {
             "currency": "ETH",        # ← ETH only
             "kind": "option",
             "expired": "false"
         }
 
-        timeout = 5.0
-        try:
-            icp = self.env['ir.config_parameter'].sudo()
-            timeout = float(icp.get_param('dankbit.deribit_timeout', default=5.0))
-            cache_ttl = float(icp.get_param('dankbit.deribit_cache_ttl', default=300.0))
-        except Exception:
-            cache_ttl = 300.0
+        settings = DankbitSettings.get(self.env)
+        timeout = settings.deribit_timeout
+        cache_ttl = settings.deribit_cache_ttl if settings.deribit_cache_ttl is not None else 300.0
 
         now_ts = time.time()
         cached = _DERIBIT_CACHE.get('instruments', {})
@@ -249,30 +601,26 @@ class Trade(models.Model):
             return cached.get('value', [])
 
     def _create_new_trade(self, trade, expiration_ts):
-        exists = self.env["dankbit.trade"].search(
-            domain=[("deribit_trade_identifier", "=", str(trade.get("trade_id")))],
-            limit=1
-        )
+        return self._create_trades_batch([trade], expiration_ts)
 
-        icp = self.env['ir.config_parameter'].sudo()
-        try:
-            start_from_ts = int(icp.get_param("dankbit.from_days_ago", default=2))
-        except Exception:
-            start_from_ts = 2
+    def _get_ingest_min_ts(self):
+        return self._get_midnight_dt(DankbitSettings.get(self.env).from_days_ago)
 
-        start_ts = self._get_midnight_dt(start_from_ts)
-
-        if exists or trade.get("timestamp", 0) <= start_ts:
-            return
+    @api.model
+    def _prepare_trade_vals(self, trade, expiration_ts):
+        """Map a raw Deribit trade dict to dankbit.trade column values.
 
+        Stored computes (strike, option_type) are filled in here as well,
+        because the batch insert bypasses the ORM.
+        """
         try:
             deribit_dt = datetime.fromtimestamp(trade["timestamp"]/1000, tz=timezone.utc)
             exp_dt = datetime.fromtimestamp(expiration_ts/1000, tz=timezone.utc) if expiration_ts else None
             deribit_str = fields.Datetime.to_string(deribit_dt)
-            exp_str = fields.Datetime.to_string(exp_dt) if exp_dt else False
+            exp_str = fields.Datetime.to_string(exp_dt) if exp_dt else None
         except Exception:
             deribit_str = datetime.fromtimestamp(trade["timestamp"]/1000).strftime('%Y-%m-%d %H:%M:%S')
-            exp_str = datetime.fromtimestamp(expiration_ts/1000).strftime('%Y-%m-%d %H:%M:%S') if expiration_ts else False
+            exp_str = datetime.fromtimestamp(expiration_ts/1000).strftime('%Y-%m-%d %H:%M:%S') if expiration_ts else None
 
         block_trade_id = trade.get("block_trade_id")
         is_block_trade = (
@@ -281,8 +629,26 @@ class Trade(models.Model):
             or bool(block_trade_id)
         )
 
-        vals = {
-            "name": trade.get("instrument_name"),
+        name = trade.get("instrument_name")
+        underlying, expiry_date = _parse_instrument_name(name)
+        option_type = None
+        strike = 0
+        if name:
+            if name[-1] == "P":
+                option_type = "put"
+            elif name[-1] == "C":
+                option_type = "call"
+            try:
+                strike = int(str(name).split("-")[2])
+            except Exception:
+                strike = 0
+
+        return {
+            "name": name,
+            "underlying": underlying or None,
+            "expiry_date": expiry_date or None,
+            "strike": strike,
+            "option_type": option_type,
             "iv": trade.get("iv"),
             "index_price": trade.get("index_price"),
             "price": trade.get("price"),
@@ -294,12 +660,85 @@ class Trade(models.Model):
             "contracts": trade.get("contracts", trade.get("amount")),
             "deribit_ts": deribit_str,
             "expiration": exp_str,
-            "is_block_trade": is_block_trade,
+            "is_block_trade": bool(is_block_trade),
             "block_trade_id": block_trade_id if block_trade_id else None,
         }
-        self.env["dankbit.trade"].create(vals)
-        _logger.info('*** Trade Created: %s (trade_id=%s) ***',
-                     trade.get("instrument_name"), trade.get("trade_id"))
+
+    def _create_trades_batch(self, trades, expiration_ts, min_ts=None, expirations=None):
+        """Insert a page of raw Deribit trades with a single statement.
+
+        Known trade IDs are filtered with one lookup and the insert skips
+        the rest through the deribit_trade_identifier_uniqe constraint (ON
+        CONFLICT DO NOTHING). That only covers rows this transaction can
+        see: a trade committed by a concurrent ingester after our snapshot
+        was taken makes the insert raise a serialization failure under
+        REPEATABLE READ, so callers run it through odoo.service.model.retrying.
+        `expirations` optionally maps instrument names to expiry timestamps
+        for mixed-instrument pages. Returns {new record id: instrument name}.
+        """
+        if min_ts is None:
+            min_ts = self._get_ingest_min_ts()
+
+        by_identifier = {}
+        for trd in trades:
+            if trd.get("timestamp", 0) <= min_ts:
+                continue
+            by_identifier[str(trd.get("trade_id"))] = trd
+        if not by_identifier:
+            return {}
+
+        cr = self.env.cr
+        cr.execute(
+            "SELECT deribit_trade_identifier FROM dankbit_trade"
+            " WHERE deribit_trade_identifier = ANY(%s)",
+            [list(by_identifier)],
+        )
+        for (identifier,) in cr.fetchall():
+            by_identifier.pop(identifier, None)
+        if not by_identifier:
+            return {}
+
+        if expirations:
+            vals_list = [
+                self._prepare_trade_vals(trd, expirations.get(trd.get("instrument_name"), expiration_ts))
+                for trd in by_identifier.values()
+            ]
+        else:
+            vals_list = [self._prepare_trade_vals(trd, expiration_ts) for trd in by_identifier.values()]
+        columns = list(vals_list[0])
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        rows = [
+            tuple(vals[col] for col in columns) + (uid, now, uid, now)
+            for vals in vals_list
+        ]
+        cr.execute(SQL(
+            """
+            INSERT INTO dankbit_trade (%s) VALUES %s
+            ON CONFLICT (deribit_trade_identifier) DO NOTHING
+            RETURNING id, name
+            """,
+            SQL(", ").join(SQL.identifier(col) for col in
+                           columns + ["create_uid", "create_date", "write_uid", "write_date"]),
+            SQL(", ").join(SQL("%s", row) for row in rows),
+        ))
+        new_ids = dict(cr.fetchall())
+        if new_ids:
+            names = {name for name in new_ids.values() if name}
+            self.env["dankbit.trade"].invalidate_model()
+            self.env["dankbit.trade_rollup"]._add_trades(list(new_ids))
+            self._notify_new_trades(names)
+            _logger.info('*** %d trades created (%s) ***', len(new_ids), ", ".join(sorted(names)))
+        return new_ids
+
+    @api.model
+    def _notify_new_trades(self, names):
+        """Wake the live chart streams of `names` once this transaction commits."""
+        pending = self.env.cr.postcommit.data.setdefault("dankbit.new_trades", set())
+        if not pending:
+            dbname = self.env.cr.dbname
+            self.env.cr.postcommit.add(lambda: chart_events.notify(dbname, pending))
+        pending.update(names)
 
     @staticmethod
     def _get_midnight_dt(days_offset=0):
@@ -307,6 +746,28 @@ class Trade(models.Model):
         midnight = datetime(now.year, now.month, now.day, 0, 0, 0, tzinfo=timezone.utc)
         return int((midnight - timedelta(days=days_offset)).timestamp() * 1000)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.flush_recordset()
+        self.env["dankbit.trade_rollup"]._add_trades(records.ids)
+        return records
+
+    def write(self, vals):
+        if not _ROLLUP_FIELDS.intersection(vals):
+            return super().write(vals)
+        names = set(self.mapped("name"))
+        res = super().write(vals)
+        self.flush_recordset()
+        self.env["dankbit.trade_rollup"]._rebuild(names | set(self.mapped("name")))
+        return res
+
+    def unlink(self):
+        names = set(self.mapped("name"))
+        res = super().unlink()
+        self.env["dankbit.trade_rollup"]._rebuild(names)
+        return res
+
     def _delete_expired_trades(self):
         self.env['dankbit.trade'].search(
             domain=[("expiration", "<", fields.Datetime.now())]
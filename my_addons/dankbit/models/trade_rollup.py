@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+from .trade import _group_iv_buckets, _stream_trade_columns
+
+_logger = logging.getLogger(__name__)
+
+# Width (IV points) of the IV buckets rollup rows are keyed on; charts with
+# an IV bucket width that is a multiple of it can be read from the rollups.
+ROLLUP_IV_STEP = 0.5
+
+
+class TradeRollup(models.Model):
+    """Per-minute sums of dankbit.trade.
+
+    One row per minute, instrument, direction, block flag and
+    ROLLUP_IV_STEP-wide IV bucket, maintained in the transaction that
+    changes the trades (see _add_trades and the dankbit.trade
+    create/write/unlink overrides). Charts evaluate IV-bucketed trades at
+    the middle of their bucket, and every chart bucket is a whole number of
+    rollup buckets, so for those widths the rows give the same curves as the
+    trades (see _supports_iv_bucket_width). Per-trade IVs (width 0) need the
+    trades themselves. The instrument columns have the same names as on
+    dankbit.trade, so chart filter domains work on both; deribit_ts becomes
+    `minute`.
+    """
+    _name = "dankbit.trade_rollup"
+    _description = "Dankbit Per-Minute Trade Rollup"
+    _order = "minute desc"
+
+    minute = fields.Datetime(required=True)
+    name = fields.Char(required=True, index=True)
+    underlying = fields.Char()
+    expiry_date = fields.Date()
+    strike = fields.Integer()
+    option_type = fields.Text()
+    direction = fields.Selection([("buy", "Buy"), ("sell", "Sell")], required=True)
+    is_block_trade = fields.Boolean(required=True)
+    iv_bucket = fields.Integer(string="IV Bucket", required=True,
+                               help="IV // ROLLUP_IV_STEP of the trades.")
+    expiration = fields.Datetime()
+    trade_count = fields.Integer()
+    signed_amount = fields.Float(help="Sum of the trade amounts, negative for sells.")
+    premium = fields.Float(help="Sum of price * index_price.")
+    iv_amount = fields.Float(help="Sum of iv * amount; divided by the amount it is the "
+                                  "amount-weighted IV.")
+
+    _sql_constraints = [
+        ("minute_name_direction_block_uniqe",
+         "unique (minute, name, direction, is_block_trade, iv_bucket)",
+         "There can only be one rollup per minute, instrument, direction, block flag and IV bucket!")
+    ]
+
+    def init(self):
+        # chart windows, like dankbit_trade_expiry_block_ts_index
+        create_index(self.env.cr, "dankbit_trade_rollup_expiry_block_minute_index", self._table,
+                     ["expiry_date", "is_block_trade", "minute"])
+        # columns added by an upgrade are only queued for computation
+        self.env["dankbit.trade"].flush_model(["underlying", "expiry_date", "strike", "option_type"])
+        # backfill, and catch up with trade changes made outside the ORM or
+        # rollups built before the instrument columns were computed
+        self.env.cr.execute("""
+            SELECT (SELECT COUNT(*) FROM dankbit_trade WHERE deribit_ts IS NOT NULL),
+                   (SELECT COALESCE(SUM(trade_count), 0) FROM dankbit_trade_rollup),
+                   EXISTS (SELECT 1 FROM dankbit_trade_rollup WHERE iv_bucket IS NULL)
+                   OR EXISTS (SELECT 1 FROM dankbit_trade_rollup r
+                                JOIN dankbit_trade t ON t.name = r.name
+                               WHERE r.expiry_date IS NULL AND t.expiry_date IS NOT NULL)
+        """)
+        trades, rolled_up, stale = self.env.cr.fetchone()
+        if trades != rolled_up or stale:
+            self._rebuild()
+
+    def _insert_from_trades(self, where):
+        """Add the trades matching the SQL condition `where` (on dankbit_trade t)."""
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO dankbit_trade_rollup AS r
+                (minute, name, underlying, expiry_date, strike, option_type, direction,
+                 is_block_trade, iv_bucket, expiration, trade_count, signed_amount, premium,
+                 iv_amount, create_uid, create_date, write_uid, write_date)
+            SELECT date_trunc('minute', t.deribit_ts), t.name, MAX(t.underlying),
+                   MAX(t.expiry_date), MAX(t.strike), MAX(t.option_type), t.direction,
+                   COALESCE(t.is_block_trade, FALSE), FLOOR(t.iv / %(step)s::numeric)::int,
+                   MAX(t.expiration), COUNT(*),
+                   SUM(CASE WHEN t.direction = 'sell' THEN -t.amount ELSE t.amount END::float8),
+                   SUM(t.price::float8 * t.index_price::float8),
+                   SUM(t.iv::float8 * t.amount::float8),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM dankbit_trade t
+             WHERE t.deribit_ts IS NOT NULL AND %(where)s
+             GROUP BY 1, t.name, t.direction, COALESCE(t.is_block_trade, FALSE), 9
+            ON CONFLICT (minute, name, direction, is_block_trade, iv_bucket) DO UPDATE
+               SET trade_count = r.trade_count + EXCLUDED.trade_count,
+                   signed_amount = r.signed_amount + EXCLUDED.signed_amount,
+                   premium = r.premium + EXCLUDED.premium,
+                   iv_amount = r.iv_amount + EXCLUDED.iv_amount,
+                   write_date = EXCLUDED.write_date
+            """,
+            uid=self.env.uid,
+            step=ROLLUP_IV_STEP,
+            where=where,
+        ))
+
+    @api.model
+    def _add_trades(self, trade_ids):
+        """Fold freshly inserted trades into their minutes."""
+        if trade_ids:
+            self._insert_from_trades(SQL("t.id = ANY(%s)", list(trade_ids)))
+
+    @api.model
+    def _rebuild(self, names=None):
+        """Recompute the rollups of the instruments `names` (all when None)."""
+        if names is not None and not names:
+            return
+        if names is None:
+            self.env.cr.execute("DELETE FROM dankbit_trade_rollup")
+            self._insert_from_trades(SQL("TRUE"))
+        else:
+            self.env.cr.execute("DELETE FROM dankbit_trade_rollup WHERE name = ANY(%s)", [list(names)])
+            self._insert_from_trades(SQL("t.name = ANY(%s)", list(names)))
+        self.invalidate_model()
+        _logger.info("Rebuilt trade rollups (%s)", "all" if names is None else len(names))
+
+    @api.model
+    def _supports_iv_bucket_width(self, iv_bucket_width):
+        """Whether chart IV buckets of `iv_bucket_width` are whole numbers of
+        rollup buckets, i.e. whether the rollups can stand in for the trades."""
+        steps = (iv_bucket_width or 0.0) / ROLLUP_IV_STEP
+        return steps >= 1 and abs(steps - round(steps)) < 1e-9
+
+    @api.model
+    def _iter_trade_columns(self, domain, iv_bucket_width, bucket_seconds=0, chunk_size=5000):
+        """dankbit.trade._iter_trade_columns over the rollups matching `domain`."""
+        return _stream_trade_columns(self.env.cr, self._trade_rows(domain, iv_bucket_width,
+                                                                   bucket_seconds), chunk_size)
+
+    @api.model
+    def _trade_rows(self, domain, iv_bucket_width, bucket_seconds=0):
+        """dankbit.trade._trade_rows over the rollups matching `domain`.
+
+        `iv_bucket_width` must pass _supports_iv_bucket_width and
+        `bucket_seconds` must be a multiple of 60.
+        """
+        if not self._supports_iv_bucket_width(iv_bucket_width):
+            raise ValueError(f"IV bucket width {iv_bucket_width} is not a multiple of "
+                             f"{ROLLUP_IV_STEP}")
+        query = self._search(domain)
+        query.order = None
+        t = SQL.identifier(self._table)
+        return _group_iv_buckets(query.select(SQL(
+            """
+            %(t)s.strike AS strike,
+            COALESCE(%(t)s.expiration::date - (NOW() AT TIME ZONE 'UTC')::date, 0) AS days,
+            %(t)s.option_type = 'call' AS is_call,
+            CASE WHEN %(t)s.direction = 'sell' THEN -1 ELSE 1 END AS sign,
+            %(bucket)s AS bucket,
+            ABS(%(t)s.signed_amount) AS amount,
+            %(t)s.premium AS premium,
+            %(t)s.trade_count AS count,
+            FLOOR(%(t)s.iv_bucket / %(steps)s::numeric)::float8 AS iv_bucket
+            """,
+            t=t,
+            bucket=SQL("FLOOR(EXTRACT(EPOCH FROM %s.minute) / %s)::bigint", t, int(bucket_seconds))
+            if bucket_seconds and bucket_seconds > 0 else SQL("0"),
+            steps=round(iv_bucket_width / ROLLUP_IV_STEP),
+        )), iv_bucket_width)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import time
+
+import psycopg2
+
+from odoo import api, models
+from odoo.service.model import retrying
+
+from .settings import DankbitSettings
+from .trade import _expiration_ts_from_name
+
+try:
+    import websocket  # websocket-client, shipped with Odoo
+except ImportError:  # pragma: no cover
+    websocket = None
+
+_logger = logging.getLogger(__name__)
+
+DERIBIT_WS_URL = "wss://www.deribit.com/ws/api/v2"
+TRADES_CHANNEL = "trades.option.ETH.raw"
+CURSOR_KEY = "currency:ETH"
+
+
+class TradeStream(models.AbstractModel):
+    _name = "dankbit.trade_stream"
+    _description = "Dankbit Streaming Trade Ingestion"
+
+    @api.model
+    def run(self, max_seconds=None, url=None, batch_size=500, flush_interval=0.25):
+        """Ingest ETH option trades from Deribit's WebSocket trade channel.
+
+        Trades are micro-batched into dankbit.trade through the same bulk
+        insert as the REST cron and the shared "currency:ETH" cursor is
+        advanced with every batch. After each (re)connect the gap since that
+        cursor is backfilled through the REST currency endpoint.
+
+        Database errors roll the transaction back and reconnect after a
+        backoff instead of ending the run. Runs until `max_seconds` have
+        elapsed (forever if not set), so it can be started from a cron or
+        from `odoo shell`.
+        """
+        if websocket is None:
+            _logger.error("dankbit.trade_stream needs the websocket-client package")
+            return
+
+        url = url or DankbitSettings.get(self.env).deribit_ws_url or DERIBIT_WS_URL
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        backoff = 1.0
+
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                ws = websocket.create_connection(url, timeout=10)
+            except Exception as e:
+                _logger.warning("Trade stream: connect to %s failed: %s", url, e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            try:
+                self._subscribe(ws)
+                # Fill whatever was missed while disconnected; live messages
+                # queue up on the socket meanwhile and duplicates are dropped
+                # by the insert.
+                self.env["dankbit.trade"]._get_last_trades_by_currency()
+                backoff = 1.0
+                self._consume(ws, deadline, batch_size, flush_interval)
+            except (websocket.WebSocketException, OSError) as e:
+                _logger.warning("Trade stream: connection lost: %s", e)
+            except psycopg2.Error as e:
+                # The buffered trades are dropped with the transaction; the
+                # cursor was not advanced for them, so the backfill after
+                # reconnecting fetches them again.
+                self.env.cr.rollback()
+                _logger.warning("Trade stream: database error, reconnecting in %.0fs: %s",
+                                backoff, e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    ws.close()
+                except Exception:
+                    pass
+
+    @api.model
+    def _subscribe(self, ws):
+        ws.send(json.dumps({
+            "jsonrpc": "2.0", "id": 1, "method": "public/set_heartbeat",
+            "params": {"interval": 30},
+        }))
+        ws.send(json.dumps({
+            "jsonrpc": "2.0", "id": 2, "method": "public/subscribe",
+            "params": {"channels": [TRADES_CHANNEL]},
+        }))
+
+    @api.model
+    def _consume(self, ws, deadline, batch_size, flush_interval):
+        ws.settimeout(flush_interval)
+        buffer = []
+        first_buffered = None
+        received = 0
+        started = last_report = time.monotonic()
+
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                raw = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                raw = None
+
+            if raw:
+                msg = json.loads(raw)
+                method = msg.get("method")
+                if method == "subscription":
+                    trades = msg.get("params", {}).get("data") or []
+                    if trades and not buffer:
+                        first_buffered = time.monotonic()
+                    buffer.extend(trades)
+                    received += len(trades)
+                elif method == "heartbeat":
+                    if msg.get("params", {}).get("type") == "test_request":
+                        ws.send(json.dumps({"jsonrpc": "2.0", "id": 3, "method": "public/test"}))
+                elif msg.get("error"):
+                    _logger.warning("Trade stream: server error %s", msg["error"])
+
+            if buffer and (len(buffer) >= batch_size
+                           or time.monotonic() - first_buffered >= flush_interval):
+                self._flush(buffer)
+                buffer = []
+
+            now = time.monotonic()
+            if now - last_report >= 60:
+                _logger.info("Trade stream: %d trades received (%.1f/s)",
+                             received, received / (now - started))
+                last_report = now
+                self.env["dankbit.chart_snapshot"].sudo()._gc_snapshots()
+                self.env.cr.commit()
+
+        if buffer:
+            self._flush(buffer)
+
+    @api.model
+    def _flush(self, trades):
+        Trade = self.env["dankbit.trade"]
+        known = {
+            inst.get("instrument_name"): inst.get("expiration_timestamp")
+            for inst in Trade._get_instruments()
+        }
+        expirations = {
+            trd.get("instrument_name"): (known.get(trd.get("instrument_name"))
+                                         or _expiration_ts_from_name(trd.get("instrument_name")))
+            for trd in trades
+        }
+        min_ts = Trade._get_ingest_min_ts()
+        last = max(trades, key=lambda t: t.get("timestamp", 0))
+
+        def ingest():
+            new_ids = Trade._create_trades_batch(trades, None, min_ts, expirations=expirations)
+            self.env["dankbit.ingest_cursor"].sudo()._advance(
+                CURSOR_KEY, last.get("timestamp", 0), last.get("trade_seq"))
+            return new_ids
+
+        # the REST backfill may be inserting the same trades: retry on
+        # serialization failures, then commit
+        new_ids = retrying(ingest, self.env)
+        _logger.debug("Trade stream: flushed %d trades (%d new)", len(trades), len(new_ids))
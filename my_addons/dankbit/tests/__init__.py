@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import test_greeks
+from . import test_payoff
+from . import test_prefix_curves
+from . import test_trade_rollup
+from . import test_chart
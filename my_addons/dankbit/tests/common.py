@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from odoo.tests import TransactionCase
+
+from ..lib.accumulator import ACCUMULATORS, PREFIX_CURVES
+
+_TRADE_IDS = itertools.count(1)
+
+
+class DankbitTradeCase(TransactionCase):
+    """Trades of one ETH expiry ten days out, inserted like the ingestion does."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Trade = cls.env["dankbit.trade"]
+        cls.Rollup = cls.env["dankbit.trade_rollup"]
+        cls.Chart = cls.env["dankbit.chart"]
+        expiry = datetime.now(timezone.utc).date() + timedelta(days=10)
+        cls.expiry = f"ETH-{expiry.day}{expiry.strftime('%b').upper()}{expiry.strftime('%y')}"
+        cls.expiration_ts = int(datetime(expiry.year, expiry.month, expiry.day, 8,
+                                         tzinfo=timezone.utc).timestamp() * 1000)
+        cls.now = datetime.now(timezone.utc).replace(second=0, microsecond=0, tzinfo=None)
+
+    def setUp(self):
+        super().setUp()
+        # the caches outlive the test transaction
+        ACCUMULATORS.clear()
+        PREFIX_CURVES.clear()
+        self.addCleanup(ACCUMULATORS.clear)
+        self.addCleanup(PREFIX_CURVES.clear)
+
+    def _deribit_trade(self, when, strike=3000, kind="C", direction="buy", iv=55.5, amount=1.0):
+        """A raw Deribit trade dict at the naive UTC datetime `when`."""
+        trade_id = next(_TRADE_IDS)
+        return {
+            "trade_id": f"TEST-{trade_id}",
+            "instrument_name": f"{self.expiry}-{strike}-{kind}",
+            "timestamp": int(when.replace(tzinfo=timezone.utc).timestamp() * 1000),
+            "trade_seq": trade_id,
+            "direction": direction,
+            "iv": iv,
+            "amount": amount,
+            "price": 0.01 * (1 + trade_id % 7),
+            "mark_price": 0.01,
+            "index_price": 2500.0,
+        }
+
+    def _insert(self, trades):
+        return self.Trade._create_trades_batch(trades, self.expiration_ts)
+
+    def _random_trades(self, count, minutes, seed=0):
+        """`count` trades over the last `minutes` minutes, with IVs repeating
+        within a minute so that rollups merge some of them."""
+        rng = np.random.default_rng(seed)
+        return [
+            self._deribit_trade(
+                self.now - timedelta(seconds=int(rng.integers(1, minutes * 60))),
+                strike=int(rng.choice([2000, 2500, 3000, 3500])),
+                kind=str(rng.choice(["C", "P"])),
+                direction=str(rng.choice(["buy", "sell"])),
+                iv=float(rng.choice([50.0, 50.5, 52.25, 61.0])),
+                amount=float(rng.choice([0.5, 1.0, 3.0])),
+            )
+            for _ in range(count)
+        ]
+
+    def assertCurvesEqual(self, acc, other):
+        self.assertEqual(acc.trade_count, other.trade_count)
+        for name in ("payoffs", "deltas", "gammas"):
+            np.testing.assert_allclose(getattr(acc, name), getattr(other, name),
+                                       rtol=1e-9, atol=1e-9, err_msg=name)
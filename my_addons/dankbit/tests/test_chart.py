@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import fields
+
+from ..models.settings import DankbitSettings
+from .common import DankbitTradeCase
+
+
+class TestChartWindow(DankbitTradeCase):
+
+    def test_last_hedging_time(self):
+        """Fixed-start charts begin at last_hedging_time, a config parameter string."""
+        hedging = self.now - timedelta(minutes=30, seconds=-17)
+        self._insert([
+            self._deribit_trade(hedging - timedelta(minutes=5)),
+            self._deribit_trade(hedging - timedelta(seconds=5), kind="P"),
+            self._deribit_trade(hedging + timedelta(seconds=5)),
+            self._deribit_trade(hedging + timedelta(seconds=20), kind="P", direction="sell"),
+            self._deribit_trade(hedging + timedelta(minutes=10), iv=60.0),
+        ])
+        self.env["ir.config_parameter"].sudo().set_param(
+            "dankbit.last_hedging_time", fields.Datetime.to_string(hedging))
+        settings = DankbitSettings.get(self.env)
+        self.assertIsInstance(settings.last_hedging_time, str)
+
+        for chart, domain in (("mm", []), ("c", [("option_type", "=", "call")])):
+            spec = self.Chart._chart_spec(self.expiry, chart, settings)
+            self.assertEqual(spec["window_start"], hedging)
+            acc = self.Chart._chart_accumulator(self.expiry, spec, settings)
+            expected = self.Trade.search_count(
+                self.Trade._instrument_domain(self.expiry) + domain + [
+                    ("deribit_ts", ">=", hedging), ("is_block_trade", "=", False)])
+            self.assertEqual(acc.trade_count, expected, chart)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from scipy.stats import norm
+
+from odoo.tests.common import BaseCase
+
+from ..lib import greeks
+from ..lib.greeks import TradeColumns
+from ..models.settings import DankbitSettings
+
+
+def bs_delta(S, K, T, r, sigma, option_type="call", min_time_hours=1.0):
+    """Per-trade delta as the charts computed it before vectorizing."""
+    T_eff = max(T, min_time_hours / (24.0 * 365.0))
+    sigma_eff = max(sigma, 1e-4)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma_eff**2) * T_eff) / (sigma_eff * np.sqrt(T_eff))
+    return norm.cdf(d1) if option_type == "call" else norm.cdf(d1) - 1
+
+
+def bs_gamma(S, K, T, r, sigma, min_time_hours=1.0):
+    """Per-trade gamma as the charts computed it before vectorizing."""
+    T_eff = max(T, min_time_hours / (24.0 * 365.0))
+    sigma_eff = max(sigma, 1e-4)
+    d1 = (np.log(S / K) + (r + 0.044 * sigma_eff**2) * T_eff) / (sigma_eff * np.sqrt(T_eff))
+    return norm.pdf(d1) / (S * sigma_eff * np.sqrt(T_eff))
+
+
+class TestGreeks(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(11)
+        size = 300
+        # includes expired (0 days) and zero-vol trades to hit the regularization
+        self.trades = TradeColumns(
+            rng.choice([1800.0, 2200.0, 2500.0, 2750.0, 3400.0], size),
+            rng.choice([0, 1, 2, 7, 30, 90], size),
+            rng.choice([0.0, 35.0, 60.0, 95.0, 140.0], size) + rng.uniform(0, 5, size),
+            rng.uniform(0.1, 25, size), rng.choice([-1, 1], size), rng.random(size) < 0.5,
+            rng.uniform(1, 100, size),
+        )
+        self.STs = np.arange(1500.0, 3800.0, 25.0)
+
+    def _baseline(self, r, min_time_hours, mock_0dte=False):
+        cols = self.trades
+        delta = np.zeros_like(self.STs)
+        gamma = np.zeros_like(self.STs)
+        for i in range(len(cols)):
+            T = 0.0 if mock_0dte else cols.days_to_expiry[i] / 365
+            qty = cols.sign[i] * cols.amount[i]
+            option_type = "call" if cols.is_call[i] else "put"
+            delta += qty * bs_delta(self.STs, cols.strike[i], T, r, cols.iv[i] / 100,
+                                    option_type, min_time_hours)
+            gamma += qty * bs_gamma(self.STs, cols.strike[i], T, r, cols.iv[i] / 100,
+                                    min_time_hours)
+        return delta, gamma
+
+    def test_trade_greeks_match_per_trade_sum(self):
+        for r, min_time_hours, mock_0dte in ((0.0, 1.0, False), (0.05, 4.0, False),
+                                             (0.05, 1.0, True)):
+            with self.subTest(r=r, min_time_hours=min_time_hours, mock_0dte=mock_0dte):
+                settings = DankbitSettings(greeks_min_time_hours=min_time_hours,
+                                           mock_0dte=mock_0dte)
+                delta, gamma = greeks.trade_greeks(self.STs, self.trades, r, settings)
+                want_delta, want_gamma = self._baseline(r, min_time_hours, mock_0dte)
+                np.testing.assert_allclose(delta, want_delta, rtol=1e-9, atol=1e-9)
+                np.testing.assert_allclose(gamma, want_gamma, rtol=1e-9, atol=1e-12)
+
+    def test_chunking_and_scalar_price(self):
+        cols = self.trades
+        args = (cols.strike, cols.days_to_expiry / 365, cols.iv / 100, cols.sign * cols.amount,
+                cols.is_call)
+        delta, gamma = greeks.portfolio_greeks(self.STs, *args)
+        chunked = greeks.portfolio_greeks(self.STs, *args, chunk_size=7)
+        np.testing.assert_allclose(chunked[0], delta, rtol=1e-12, atol=1e-9)
+        np.testing.assert_allclose(chunked[1], gamma, rtol=1e-12, atol=1e-12)
+
+        d, g = greeks.portfolio_greeks(self.STs[10], *args)
+        self.assertAlmostEqual(d, delta[10], places=9)
+        self.assertAlmostEqual(g, gamma[10], places=12)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from odoo.tests.common import BaseCase
+
+from ..lib.payoff import PayoffCurve
+
+
+def leg_payoffs(S, strikes, premiums, qty, is_call):
+    """Expiry P&L summed leg by leg, one np.maximum pass per leg."""
+    total = np.zeros_like(S)
+    for K, C, q, call in zip(strikes, premiums, qty, is_call):
+        intrinsic = np.maximum(S - K, 0.0) if call else np.maximum(K - S, 0.0)
+        total += q * (intrinsic - C)
+    return total
+
+
+class TestPayoffCurve(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(3)
+        size = 400
+        self.legs = (
+            rng.choice(np.arange(1500.0, 4001.0, 100.0), size),
+            rng.uniform(1, 300, size),
+            rng.choice([-1, 1], size) * rng.uniform(0.1, 20, size),
+            rng.random(size) < 0.5,
+        )
+        # strikes themselves, points between them and the open ends
+        self.STs = np.concatenate((np.arange(0.0, 6000.0, 7.5), np.unique(self.legs[0])))
+
+    def _curve(self, legs, parts=3):
+        curve = PayoffCurve()
+        for index in np.array_split(np.arange(legs[0].size), parts):
+            curve.add(*(col[index] for col in legs))
+        return curve
+
+    def test_matches_per_leg_payoff(self):
+        curve = self._curve(self.legs)
+        want = leg_payoffs(self.STs, *self.legs)
+        np.testing.assert_allclose(curve(self.STs), want, rtol=1e-9, atol=1e-6)
+
+        # adding legs after an evaluation recompiles the curve
+        extra = (np.array([2250.0]), np.array([50.0]), np.array([-3.0]), np.array([False]))
+        curve.add(*extra)
+        want += leg_payoffs(self.STs, *extra)
+        np.testing.assert_allclose(curve(self.STs), want, rtol=1e-9, atol=1e-6)
+
+    def test_breakevens_are_zeros(self):
+        for seed in range(5):
+            rng = np.random.default_rng(seed)
+            legs = tuple(col[rng.choice(col.size, 12, replace=False)] for col in self.legs)
+            with self.subTest(seed=seed):
+                curve = self._curve(legs)
+                roots = curve.breakevens()
+                scale = np.abs(legs[2]).sum() * 100.0
+                np.testing.assert_allclose(leg_payoffs(roots, *legs), 0.0, atol=1e-9 * scale)
+                # every sign change on a fine grid has a breakeven next to it
+                grid = np.arange(0.0, 6000.0, 0.5)
+                values = leg_payoffs(grid, *legs)
+                changes = grid[:-1][np.sign(values[:-1]) * np.sign(values[1:]) < 0]
+                for price in changes:
+                    self.assertTrue(np.any(np.abs(roots - price) <= 0.5), price)
+
+    def test_empty_and_single_leg(self):
+        self.assertEqual(PayoffCurve()(2000.0), 0.0)
+        self.assertEqual(PayoffCurve().breakevens().size, 0)
+
+        curve = PayoffCurve()
+        curve.add(2000.0, 100.0, 1.0, True)
+        np.testing.assert_allclose(curve(np.array([1500.0, 2100.0, 2500.0])), [-100.0, 0.0, 400.0])
+        np.testing.assert_allclose(curve.breakevens(), [2100.0])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from odoo.tests.common import BaseCase
+
+from ..lib.accumulator import AccumulatorCache, PrefixCurves, evaluate
+from ..lib.greeks import TradeColumns
+from ..models.settings import DankbitSettings
+
+ORIGIN = 1_700_000_000 // 60 * 60
+MINUTES = 300
+
+
+class TestPrefixCurves(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.settings = DankbitSettings(iv_bucket_width=0.0)
+        rng = np.random.default_rng(7)
+        size = 2000
+        self.buckets = ORIGIN // 60 + rng.integers(0, MINUTES, size)
+        self.trades = TradeColumns(
+            rng.choice([2000.0, 2500.0, 3000.0, 3500.0], size), rng.integers(1, 30, size),
+            rng.uniform(40, 80, size), rng.uniform(0.1, 5, size), rng.choice([-1, 1], size),
+            rng.random(size) < 0.5, rng.uniform(1, 100, size), bucket=self.buckets,
+        )
+        self.rng = rng
+
+    def _assert_window(self, prefix, start):
+        boundary, payoffs, deltas, gammas, trade_count = prefix.window(start)
+        mask = self.buckets * 60 >= boundary
+        self.assertEqual(trade_count, int(mask.sum()))
+        expected = evaluate(self.trades.take(mask), prefix.strat.STs, self.settings)
+        for got, want in zip((payoffs, deltas, gammas), expected):
+            np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-9)
+
+    def test_windows_match_direct_evaluation(self):
+        """Windows of chunks added in and out of time order equal evaluating their trades."""
+        prefix = PrefixCurves("ETH", self.settings, ORIGIN)
+        order = np.argsort(self.buckets, kind="stable")
+        in_order, late = order[:1500], self.rng.permutation(order[1500:])
+        for i in range(0, len(in_order), 100):
+            prefix.add(self.trades.take(in_order[i:i + 100]), self.settings)
+        for i in range(0, len(late), 125):
+            prefix.add(self.trades.take(late[i:i + 125]), self.settings)
+
+        self.assertEqual(prefix.trade_count, len(self.trades))
+        self.assertEqual(prefix.peak_chunk, 125)
+        for start in (ORIGIN, ORIGIN + 61, ORIGIN + 120 * 60 + 5, ORIGIN + (MINUTES - 1) * 60,
+                      ORIGIN + (MINUTES + 10) * 60):
+            self._assert_window(prefix, start)
+
+    def test_trim(self):
+        prefix = PrefixCurves("ETH", self.settings, ORIGIN)
+        prefix.add(self.trades, self.settings)
+        prefix.trim(ORIGIN + 100 * 60 + 30)
+
+        self.assertEqual(prefix.origin, ORIGIN + 100 * 60)
+        self.assertEqual(prefix.trade_count, int((self.buckets >= ORIGIN // 60 + 100).sum()))
+        self._assert_window(prefix, ORIGIN)
+        self._assert_window(prefix, ORIGIN + 150 * 60)
+
+    def test_trades_before_origin(self):
+        prefix = PrefixCurves("ETH", self.settings, ORIGIN + 60)
+        with self.assertRaises(ValueError):
+            prefix.add(self.trades, self.settings)
+
+    def test_cache_bounded_by_bytes(self):
+        prefix = PrefixCurves("ETH", self.settings, ORIGIN)
+        prefix.add(self.trades, self.settings)
+        cache = AccumulatorCache(max_entries=10, max_bytes=int(prefix.nbytes * 2.5))
+        for key in range(5):
+            cache.get(key, lambda: PrefixCurves("ETH", self.settings, ORIGIN))
+        for key in (10, 11, 12):
+            cache.get(key, lambda: prefix)
+        self.assertEqual(list(cache._entries), [11, 12])
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+from dataclasses import replace
+from datetime import timedelta
+
+from ..lib.accumulator import CurveAccumulator
+from ..models.settings import DankbitSettings
+from .common import DankbitTradeCase
+
+CHART_LOGGER = "odoo.addons.dankbit.models.chart"
+
+
+class TestTradeRollup(DankbitTradeCase):
+
+    def setUp(self):
+        super().setUp()
+        self._insert(self._random_trades(300, 90))
+        self.filters = self.Trade._instrument_domain(self.expiry) + [("is_block_trade", "=", False)]
+
+    def _rollup_rows(self):
+        self.Rollup.flush_model()
+        self.env.cr.execute("""
+            SELECT minute, name, underlying, expiry_date, direction, is_block_trade, iv_bucket,
+                   trade_count, ROUND(signed_amount::numeric, 6), ROUND(premium::numeric, 6),
+                   ROUND(iv_amount::numeric, 6)
+              FROM dankbit_trade_rollup
+             ORDER BY minute, name, direction, is_block_trade, iv_bucket
+        """)
+        return self.env.cr.fetchall()
+
+    def _from_trades(self, start, settings):
+        """CurveAccumulator of the raw trades from `start`, read in one go."""
+        acc = CurveAccumulator(self.expiry, settings)
+        acc.add(self.Trade._read_trade_columns(self.filters + [("deribit_ts", ">=", start)],
+                                               settings.iv_bucket_width), settings)
+        return acc
+
+    def test_rebuild_matches_incremental(self):
+        """Rollups upserted batch by batch equal rebuilding them from the trades."""
+        # more trades in the same minutes, merged with ON CONFLICT
+        self._insert(self._random_trades(200, 90, seed=1))
+        incremental = self._rollup_rows()
+        self.Rollup._rebuild()
+        self.assertEqual(self._rollup_rows(), incremental)
+
+    def test_rollup_curves_match_trades(self):
+        """Curves folded in chunks from the rollups and the partial minute at
+        the window start equal those of all trades read at once, for IV
+        bucket widths the rollups support (1.0, 1.5) and those they do not
+        (0 = per trade, 0.3)."""
+        start = self.now - timedelta(minutes=45, seconds=20)
+        domain = self.filters + [("deribit_ts", ">=", start)]
+        count, newest = self.Trade._get_trade_stats(domain)
+        self.assertTrue(self.Rollup._supports_iv_bucket_width(1.5))
+        self.assertFalse(self.Rollup._supports_iv_bucket_width(0.3))
+        for width in (0.0, 0.3, 1.0, 1.5):
+            settings = replace(DankbitSettings.get(self.env), iv_bucket_width=width,
+                               stream_chunk_size=7)
+            acc = CurveAccumulator(self.expiry, settings)
+            with self.assertNoLogs(CHART_LOGGER, "WARNING"):
+                self.Chart._fold_chart_trades(acc, self.filters, start, count, newest, settings)
+            self.assertEqual(acc.watermark, newest)
+            self.assertEqual(acc.peak_chunk, 7)
+            self.assertCurvesEqual(acc, self._from_trades(start, settings))
+
+    def test_incremental_curves_match_rebuilt(self):
+        """A chart accumulator extended with new trades equals one rebuilt from scratch."""
+        settings = DankbitSettings.get(self.env)
+        spec = self.Chart._chart_spec(self.expiry, "mm", settings)
+        acc = self.Chart._chart_accumulator(self.expiry, spec, settings)
+        self._insert(self._random_trades(50, 5, seed=2))
+        self.assertIs(self.Chart._chart_accumulator(self.expiry, spec, settings), acc)
+
+        rebuilt = CurveAccumulator(self.expiry, settings)
+        start = spec["window_start"]
+        count, newest = self.Trade._get_trade_stats(self.filters + [("deribit_ts", ">=", start)])
+        self.Chart._fold_chart_trades(rebuilt, self.filters, start, count, newest, settings)
+        self.assertEqual(acc.watermark, newest)
+        self.assertCurvesEqual(acc, rebuilt)
+        self.assertCurvesEqual(acc, self._from_trades(start, settings))
+
+    def test_orm_changes_update_rollups(self):
+        trade = self.Trade.search(self.filters, limit=1)
+        trade.write({"amount": trade.amount + 2.0, "iv": 70.25})
+        self.Trade.create({
+            "name": trade.name,
+            "deribit_ts": self.now - timedelta(minutes=3),
+            "direction": "sell",
+            "iv": 48.0,
+            "amount": 4.0,
+            "contracts": 4.0,
+            "price": 0.02,
+            "mark_price": 0.02,
+            "index_price": 2500.0,
+            "deribit_trade_identifier": "TEST-ORM",
+            "trade_seq": 1,
+            "expiration": trade.expiration,
+        })
+        incremental = self._rollup_rows()
+        self.Rollup._rebuild()
+        self.assertEqual(self._rollup_rows(), incremental)
+
+        trade.unlink()
+        remaining = self._rollup_rows()
+        self.Rollup._rebuild()
+        self.assertEqual(self._rollup_rows(), remaining)
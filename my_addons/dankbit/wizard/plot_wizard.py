@@ -1,12 +1,11 @@
-from io import BytesIO
 import base64
 import logging
 
 from odoo import api, models, fields
-from ..controllers import options
-from ..controllers import delta
-from ..controllers import gamma
-import matplotlib.pyplot as plt
+from ..lib import options
+from ..lib import greeks
+from ..lib import render_pool
+from ..models.settings import DankbitSettings
 import numpy as np
 
 
@@ -35,33 +34,19 @@ class PlotWizard(models.TransientModel):
     
     def _plot(self, trades, dankbit_view_type):
         plot_title = f"{dankbit_view_type}"
-        icp = self.env['ir.config_parameter'].sudo()
+        settings = DankbitSettings.get(self.env)
 
-        day_from_price = float(icp.get_param("dankbit.from_price", default=1500))
-        day_to_price = float(icp.get_param("dankbit.to_price", default=3500))
-        steps = int(icp.get_param("dankbit.steps", default=10))
+        day_from_price = settings.from_price
+        day_to_price = settings.to_price
+        steps = settings.steps
 
         index_price = self.env['dankbit.trade'].sudo().get_index_price()
         obj = options.OptionStrat("instrument", index_price, day_from_price, day_to_price, steps)
-        is_call = []
-
-        for trade in trades:
-            if trade.option_type == "call":
-                is_call.append(True)
-                if trade.direction == "buy":
-                    obj.long_call(trade.strike, trade.price * trade.index_price)
-                elif trade.direction == "sell":
-                    obj.short_call(trade.strike, trade.price * trade.index_price)
-            elif trade.option_type == "put":
-                is_call.append(False)
-                if trade.direction == "buy":
-                    obj.long_put(trade.strike, trade.price * trade.index_price)
-                elif trade.direction == "sell":
-                    obj.short_put(trade.strike, trade.price * trade.index_price)
+        trades = self.env['dankbit.trade'].sudo()._read_trade_columns([("id", "in", trades.ids)])
+        obj.add_trades(trades)
 
         STs = np.arange(day_from_price, day_to_price, steps)
-        market_deltas = delta.portfolio_delta(STs, trades, 0.05)
-        market_gammas = gamma.portfolio_gamma(STs, trades, 0.05)
+        market_deltas, market_gammas = greeks.trade_greeks(STs, trades, 0.05, settings)
 
         # map backend 'be_*' view types to the public-facing ones so
         # wizard-generated plots match the URL-rendered charts.
@@ -72,9 +57,5 @@ class PlotWizard(models.TransientModel):
             elif view_type == 'be_mm':
                 view_type = 'mm'
 
-        fig, _ = obj.plot(index_price, market_deltas, market_gammas, view_type, plot_title)
-        
-        buf = BytesIO()
-        fig.savefig(buf, format="png")
-        plt.close(fig)
-        return buf.getvalue()
+        curves = obj.curves(index_price, market_deltas, market_gammas, view_type, plot_title, settings)
+        return render_pool.render_png(curves, settings.render_workers, settings.render_timeout)
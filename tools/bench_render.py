@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Time chart rendering with and without reusable figure templates.
+
+Loads my_addons/dankbit/lib/render.py on its own (no Odoo needed),
+builds synthetic curves for every view type and renders each one
+--renders times on a fresh figure and on the thread's figure template.
+
+    python tools/bench_render.py --renders 20 --grid 500 --out /tmp/charts
+
+Only numpy and matplotlib are required.
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+
+RENDER_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", "my_addons", "dankbit", "lib", "render.py")
+VIEW_TYPES = ("mm", "taker", "be_taker", "be_mm")
+
+
+def load_render():
+    spec = importlib.util.spec_from_file_location("dankbit_chart_render", RENDER_PY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_curves(render, view_type, grid, seed):
+    rng = np.random.default_rng(seed)
+    STs = np.linspace(1000, 6000, grid, endpoint=False)
+    strikes = rng.choice(np.arange(1500, 5001, 100), 50)
+    weights = rng.normal(0, 20, 50)
+    width = rng.uniform(30, 150, 50)
+    bumps = np.exp(-0.5 * ((STs[None, :] - strikes[:, None]) / width[:, None]) ** 2)
+    gammas = weights @ bumps
+    deltas = np.cumsum(gammas) * (STs[1] - STs[0]) / 50
+    payoffs = np.cumsum(np.sign(rng.normal(size=grid))) * 10
+    return render.ChartCurves(
+        name="ETH-BENCH", S0=3000.0, index_price=3000.0 + rng.uniform(-100, 100),
+        STs=STs, payoffs=payoffs, market_deltas=deltas, market_gammas=gammas,
+        view_type=view_type, title=f"{view_type} today", timestamp="2024-01-01 00:00",
+        trade_count=int(rng.integers(100, 5000)),
+    )
+
+
+def bench(render, reuse, renders, grid):
+    timings = []
+    for i in range(renders):
+        for view_type in VIEW_TYPES:
+            curves = synthetic_curves(render, view_type, grid, i)
+            started = time.perf_counter()
+            render.render_png(curves, reuse=reuse)
+            timings.append(time.perf_counter() - started)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--renders", type=int, default=10, help="renders per view type")
+    parser.add_argument("--grid", type=int, default=500, help="price grid points")
+    parser.add_argument("--out", help="write one PNG per view type and mode to this directory")
+    args = parser.parse_args()
+
+    render = load_render()
+    # warm up fonts and caches so neither mode pays for them
+    render.render_png(synthetic_curves(render, "taker", args.grid, 0), reuse=False)
+
+    fresh = bench(render, False, args.renders, args.grid)
+    reused = bench(render, True, args.renders, args.grid)
+    for label, t in (("fresh figure", fresh), ("template", reused)):
+        print(f"{label:>12}: {len(t)} renders, mean {1000 * t.mean():.1f} ms, "
+              f"median {1000 * np.median(t):.1f} ms, p95 {1000 * np.percentile(t, 95):.1f} ms")
+    print(f"saving per render: {1000 * (fresh.mean() - reused.mean()):.1f} ms "
+          f"({100 * (1 - reused.mean() / fresh.mean()):.0f}%)")
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for view_type in VIEW_TYPES:
+            curves = synthetic_curves(render, view_type, args.grid, 1)
+            for reuse in (False, True):
+                name = f"{view_type}_{'template' if reuse else 'fresh'}.png"
+                with open(os.path.join(args.out, name), "wb") as f:
+                    f.write(render.render_png(curves, reuse=reuse))
+
+
+if __name__ == "__main__":
+    main()
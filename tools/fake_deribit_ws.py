@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Offline stand-in for Deribit's trade stream.
+
+Serves the JSON-RPC WebSocket API (public/subscribe, public/set_heartbeat,
+public/test) and pushes synthetic ETH option trades on
+``trades.option.ETH.raw``. Plain HTTP GETs to
+``/api/v2/public/get_last_trades_by_currency_and_time`` return the trades
+generated so far, so the ingestion's REST gap backfill works against it too.
+
+    python tools/fake_deribit_ws.py --port 8765 --rate 2000 --drop-every 50000
+
+then point dankbit.deribit_ws_url at ws://localhost:8765/ws/api/v2 and
+dankbit.deribit_api_url at http://localhost:8765/api/v2.
+Only the standard library is used.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+CHANNEL = "trades.option.ETH.raw"
+
+
+class TradeTape:
+    """Monotonic synthetic trade generator shared by all connections."""
+
+    def __init__(self, expiries=3, strikes=range(1500, 5001, 100)):
+        today = datetime.now(timezone.utc).date()
+        self.instruments = []
+        self.expirations = {}
+        for d in range(1, expiries + 1):
+            day = today + timedelta(days=d)
+            tag = f"{day.day}{day.strftime('%b').upper()}{day.strftime('%y')}"
+            expiry = datetime(day.year, day.month, day.day, 8, tzinfo=timezone.utc)
+            for strike in strikes:
+                for kind in ("C", "P"):
+                    name = f"ETH-{tag}-{strike}-{kind}"
+                    self.instruments.append(name)
+                    self.expirations[name] = int(expiry.timestamp() * 1000)
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.history = []
+
+    def next_batch(self, n):
+        now_ms = int(time.time() * 1000)
+        batch = []
+        with self.lock:
+            for _ in range(n):
+                self.seq += 1
+                name = random.choice(self.instruments)
+                index_price = 3000 + random.uniform(-50, 50)
+                batch.append({
+                    "trade_id": f"FAKE-{self.seq}",
+                    "trade_seq": self.seq,
+                    "instrument_name": name,
+                    "timestamp": now_ms,
+                    "price": round(random.uniform(0.001, 0.1), 4),
+                    "mark_price": round(random.uniform(0.001, 0.1), 4),
+                    "index_price": round(index_price, 2),
+                    "iv": round(random.uniform(30, 120), 2),
+                    "direction": random.choice(("buy", "sell")),
+                    "amount": float(random.randint(1, 50)),
+                    "contracts": float(random.randint(1, 50)),
+                })
+            self.history.extend(batch)
+        return batch
+
+    def between(self, start_ts, end_ts, count):
+        with self.lock:
+            rows = [t for t in self.history if start_ts <= t["timestamp"] <= end_ts]
+        return rows[:count], len(rows) > count
+
+
+def _recv_exact(sock, n):
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("client closed")
+        data += chunk
+    return data
+
+
+def read_frame(sock):
+    head = _recv_exact(sock, 2)
+    opcode = head[0] & 0x0F
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _recv_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _recv_exact(sock, 8))[0]
+    mask = _recv_exact(sock, 4) if head[1] & 0x80 else b"\0\0\0\0"
+    payload = bytearray(_recv_exact(sock, length))
+    for i in range(length):
+        payload[i] ^= mask[i % 4]
+    return opcode, bytes(payload)
+
+
+def write_frame(sock, payload, opcode=0x1):
+    if isinstance(payload, str):
+        payload = payload.encode()
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    sock.sendall(header + payload)
+
+
+class Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        lines = request.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {k.strip().lower(): v.strip()
+                   for k, v in (line.split(":", 1) for line in lines[1:] if ":" in line)}
+        if headers.get("upgrade", "").lower() == "websocket":
+            self.serve_websocket(headers)
+        else:
+            self.serve_rest(path)
+
+    def serve_rest(self, path):
+        url = urlparse(path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith("get_last_trades_by_currency_and_time"):
+            trades, has_more = self.server.tape.between(
+                int(params.get("start_timestamp", 0)),
+                int(params.get("end_timestamp", 2 ** 62)),
+                int(params.get("count", 1000)))
+            result = {"trades": trades, "has_more": has_more}
+        elif url.path.endswith("get_instruments"):
+            tape = self.server.tape
+            result = [{"instrument_name": n, "kind": "option", "expiration_timestamp": tape.expirations[n]}
+                      for n in tape.instruments]
+        elif url.path.endswith("get_index_price"):
+            result = {"index_price": 3000.0}
+        else:
+            result = None
+        body = json.dumps({"jsonrpc": "2.0", "result": result}).encode()
+        status = "200 OK" if result is not None else "404 Not Found"
+        self.request.sendall(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+
+    def serve_websocket(self, headers):
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()).decode()
+        self.request.sendall(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+
+        subscribed = threading.Event()
+        closed = threading.Event()
+        send_lock = threading.Lock()
+
+        def send(obj):
+            with send_lock:
+                write_frame(self.request, json.dumps(obj))
+
+        def pump():
+            sent = 0
+            interval = 0.01
+            per_tick = max(1, int(self.server.rate * interval))
+            subscribed.wait()
+            while not closed.is_set():
+                batch = self.server.tape.next_batch(per_tick)
+                try:
+                    send({"jsonrpc": "2.0", "method": "subscription",
+                          "params": {"channel": CHANNEL, "data": batch}})
+                except OSError:
+                    break
+                sent += len(batch)
+                if self.server.drop_every and sent >= self.server.drop_every:
+                    print(f"dropping connection after {sent} trades", flush=True)
+                    closed.set()
+                    self.request.shutdown(socket.SHUT_RDWR)
+                    break
+                time.sleep(interval)
+
+        threading.Thread(target=pump, daemon=True).start()
+        try:
+            while not closed.is_set():
+                opcode, payload = read_frame(self.request)
+                if opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    with send_lock:
+                        write_frame(self.request, payload, opcode=0xA)
+                    continue
+                if opcode != 0x1:
+                    continue
+                msg = json.loads(payload)
+                method = msg.get("method")
+                if method == "public/subscribe":
+                    send({"jsonrpc": "2.0", "id": msg.get("id"),
+                          "result": msg.get("params", {}).get("channels", [])})
+                    subscribed.set()
+                elif method == "public/set_heartbeat":
+                    send({"jsonrpc": "2.0", "id": msg.get("id"), "result": "ok"})
+                elif method == "public/test":
+                    send({"jsonrpc": "2.0", "id": msg.get("id"), "result": {"version": "fake"}})
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            closed.set()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=int, default=1000, help="trades per second per connection")
+    parser.add_argument("--drop-every", type=int, default=0,
+                        help="close each connection after this many trades (0 = never)")
+    args = parser.parse_args()
+
+    with Server((args.host, args.port), Handler) as server:
+        server.tape = TradeTape()
+        server.rate = args.rate
+        server.drop_every = args.drop_every
+        print(f"fake Deribit on ws://{args.host}:{args.port}/ws/api/v2 "
+              f"and http://{args.host}:{args.port}/api/v2", flush=True)
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()